@@ -44,6 +44,8 @@ IGNORED_TABLES = {
     "kycs",
     # Add any other Laravel tables here
 }
+# archive tables written by migrations, not mapped by any model
+ARCHIVE_TABLES = {"donation_duplicate"}
 
 
 def include_object(object, name, type_, reflected, compare_to):
@@ -51,7 +53,7 @@ def include_object(object, name, type_, reflected, compare_to):
     Returns False for objects that should be ignored by Alembic
     """
     # Ignore all tables in IGNORED_TABLES
-    if type_ == "table" and name in IGNORED_TABLES:
+    if type_ == "table" and name in IGNORED_TABLES | ARCHIVE_TABLES:
         return False
 
     # Ignore indexes and constraints on ignored tables
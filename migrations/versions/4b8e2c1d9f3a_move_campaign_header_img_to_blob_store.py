@@ -0,0 +1,83 @@
+"""move campaign header_img to blob store
+
+Revision ID: 4b8e2c1d9f3a
+Revises: 0e0d0630b3bf
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.campaign.constants import DEFAULT_IMAGE_CONTENT_TYPE
+from src.storage import get_blob_store
+
+# revision identifiers, used by Alembic.
+revision: str = "4b8e2c1d9f3a"
+down_revision: Union[str, None] = "0e0d0630b3bf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+campaign = sa.table(
+    "campaign",
+    sa.column("id", sa.Uuid()),
+    sa.column("header_img", sa.LargeBinary()),
+    sa.column("header_img_digest", sa.String(64)),
+    sa.column("header_img_size", sa.Integer()),
+    sa.column("header_img_content_type", sa.String()),
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "campaign", sa.Column("header_img_digest", sa.String(length=64), nullable=True)
+    )
+    op.add_column("campaign", sa.Column("header_img_size", sa.Integer(), nullable=True))
+    op.add_column(
+        "campaign", sa.Column("header_img_content_type", sa.String(), nullable=True)
+    )
+
+    # move the image bytes out one row at a time to keep memory bounded
+    bind = op.get_bind()
+    store = get_blob_store()
+    campaign_ids = bind.scalars(sa.select(campaign.c.id)).all()
+    for campaign_id in campaign_ids:
+        header_img = bind.scalar(
+            sa.select(campaign.c.header_img).where(campaign.c.id == campaign_id)
+        )
+        stored = store.put_sync(header_img or b"", DEFAULT_IMAGE_CONTENT_TYPE)
+        bind.execute(
+            sa.update(campaign)
+            .where(campaign.c.id == campaign_id)
+            .values(
+                header_img_digest=stored.digest,
+                header_img_size=stored.size,
+                header_img_content_type=stored.content_type,
+            )
+        )
+
+    op.alter_column("campaign", "header_img_digest", nullable=False)
+    op.alter_column("campaign", "header_img_size", nullable=False)
+    op.alter_column("campaign", "header_img_content_type", nullable=False)
+    op.drop_column("campaign", "header_img")
+
+
+def downgrade() -> None:
+    op.add_column("campaign", sa.Column("header_img", sa.LargeBinary(), nullable=True))
+
+    bind = op.get_bind()
+    store = get_blob_store()
+    rows = bind.execute(sa.select(campaign.c.id, campaign.c.header_img_digest)).all()
+    for campaign_id, header_img_digest in rows:
+        bind.execute(
+            sa.update(campaign)
+            .where(campaign.c.id == campaign_id)
+            .values(header_img=store.read_sync(header_img_digest))
+        )
+
+    op.alter_column("campaign", "header_img", nullable=False)
+    op.drop_column("campaign", "header_img_content_type")
+    op.drop_column("campaign", "header_img_size")
+    op.drop_column("campaign", "header_img_digest")
@@ -0,0 +1,38 @@
+"""add donation campaign created_at index
+
+Revision ID: 4c9e7a2d1b58
+Revises: b81f3e0c5a69
+Create Date: 2026-10-18 16:21:45.093182
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4c9e7a2d1b58"
+down_revision: Union[str, None] = "b81f3e0c5a69"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # build without blocking writes to the donation table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "donation_campaign_id_created_at_id_idx",
+            "donation",
+            ["campaign_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "donation_campaign_id_created_at_id_idx",
+            table_name="donation",
+            postgresql_concurrently=True,
+        )
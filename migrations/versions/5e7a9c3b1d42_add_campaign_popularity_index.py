@@ -0,0 +1,43 @@
+"""add campaign popularity index
+
+Revision ID: 5e7a9c3b1d42
+Revises: c3d5e8f1a2b7
+Create Date: 2026-10-18 12:41:55.102937
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7a9c3b1d42"
+down_revision: Union[str, None] = "c3d5e8f1a2b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # build without blocking writes to the campaign table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "campaign_popularity_idx",
+            "campaign",
+            [
+                sa.text("no_of_reactions DESC"),
+                sa.text("no_of_supporters DESC"),
+                sa.text("id DESC"),
+            ],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "campaign_popularity_idx",
+            table_name="campaign",
+            postgresql_concurrently=True,
+        )
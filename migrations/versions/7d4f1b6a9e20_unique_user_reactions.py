@@ -0,0 +1,72 @@
+"""unique user reactions
+
+Revision ID: 7d4f1b6a9e20
+Revises: 5e7a9c3b1d42
+Create Date: 2026-10-18 13:52:17.406318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4f1b6a9e20"
+down_revision: Union[str, None] = "5e7a9c3b1d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (reaction table, target column, target table)
+REACTION_TABLES = (
+    ("user_campaign_reaction", "campaign_id", "campaign"),
+    ("user_feed_post_reaction", "feed_post_id", "feedpost"),
+)
+
+
+def upgrade() -> None:
+    for reaction_table, target_column, target_table in REACTION_TABLES:
+        # keep the first reaction of every user and take the duplicates back
+        # out of the counter they were added to
+        op.execute(
+            sa.text(
+                f"""
+                WITH ranked AS (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY user_id, {target_column}
+                        ORDER BY created_at, id
+                    ) AS position
+                    FROM {reaction_table}
+                ),
+                duplicates AS (
+                    DELETE FROM {reaction_table}
+                    WHERE id IN (SELECT id FROM ranked WHERE position > 1)
+                    RETURNING {target_column}
+                )
+                UPDATE {target_table}
+                SET no_of_reactions = greatest(
+                    {target_table}.no_of_reactions - removed.count, 0
+                )
+                FROM (
+                    SELECT {target_column}, count(*) AS count
+                    FROM duplicates
+                    GROUP BY {target_column}
+                ) AS removed
+                WHERE {target_table}.id = removed.{target_column}
+                """
+            )
+        )
+        op.create_unique_constraint(
+            op.f(f"{reaction_table}_user_id_{target_column}_key"),
+            reaction_table,
+            ["user_id", target_column],
+        )
+
+
+def downgrade() -> None:
+    for reaction_table, target_column, _ in REACTION_TABLES:
+        op.drop_constraint(
+            op.f(f"{reaction_table}_user_id_{target_column}_key"),
+            reaction_table,
+            type_="unique",
+        )
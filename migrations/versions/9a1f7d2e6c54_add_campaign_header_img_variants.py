@@ -0,0 +1,37 @@
+"""add campaign header_img_variants
+
+Revision ID: 9a1f7d2e6c54
+Revises: 4b8e2c1d9f3a
+Create Date: 2026-10-18 10:04:17.552031
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9a1f7d2e6c54"
+down_revision: Union[str, None] = "4b8e2c1d9f3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing campaigns are filled in by
+    # `python -m src.campaign.cli backfill-image-variants`
+    op.add_column(
+        "campaign",
+        sa.Column(
+            "header_img_variants",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("campaign", "header_img_variants")
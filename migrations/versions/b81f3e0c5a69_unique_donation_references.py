@@ -0,0 +1,98 @@
+"""unique donation references
+
+Revision ID: b81f3e0c5a69
+Revises: e2a6c9d4f817
+Create Date: 2026-10-18 15:48:02.731594
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f3e0c5a69"
+down_revision: Union[str, None] = "e2a6c9d4f817"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCE_COLUMNS = ("payaza_reference", "transaction_reference")
+# repeated recordings of a donation are moved here rather than dropped
+ARCHIVE_TABLE = "donation_duplicate"
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text(f"CREATE TABLE {ARCHIVE_TABLE} (LIKE donation INCLUDING DEFAULTS)")
+    )
+    for reference_column in REFERENCE_COLUMNS:
+        # keep the first recording of every donation, archive the repeats and
+        # take them back out of the counters they were added to
+        op.execute(
+            sa.text(
+                f"""
+                WITH ranked AS (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY {reference_column}
+                        ORDER BY created_at, id
+                    ) AS position
+                    FROM donation
+                ),
+                duplicates AS (
+                    DELETE FROM donation
+                    WHERE id IN (SELECT id FROM ranked WHERE position > 1)
+                    RETURNING *
+                ),
+                archived AS (
+                    INSERT INTO {ARCHIVE_TABLE} SELECT * FROM duplicates
+                )
+                UPDATE campaign
+                SET no_of_supporters = greatest(
+                        campaign.no_of_supporters - removed.count, 0
+                    ),
+                    amt_reached = greatest(campaign.amt_reached - removed.amount, 0)
+                FROM (
+                    SELECT campaign_id, count(*) AS count, sum(amount) AS amount
+                    FROM duplicates
+                    GROUP BY campaign_id
+                ) AS removed
+                WHERE campaign.id = removed.campaign_id
+                """
+            )
+        )
+        op.create_unique_constraint(
+            op.f(f"donation_{reference_column}_key"),
+            "donation",
+            [reference_column],
+        )
+
+
+def downgrade() -> None:
+    for reference_column in REFERENCE_COLUMNS:
+        op.drop_constraint(
+            op.f(f"donation_{reference_column}_key"), "donation", type_="unique"
+        )
+    # put the archived repeats back, counted again
+    op.execute(
+        sa.text(
+            f"""
+            WITH restored AS (
+                DELETE FROM {ARCHIVE_TABLE} RETURNING *
+            ),
+            reinserted AS (
+                INSERT INTO donation SELECT * FROM restored
+            )
+            UPDATE campaign
+            SET no_of_supporters = campaign.no_of_supporters + added.count,
+                amt_reached = campaign.amt_reached + added.amount
+            FROM (
+                SELECT campaign_id, count(*) AS count, sum(amount) AS amount
+                FROM restored
+                GROUP BY campaign_id
+            ) AS added
+            WHERE campaign.id = added.campaign_id
+            """
+        )
+    )
+    op.drop_table(ARCHIVE_TABLE)
@@ -0,0 +1,128 @@
+"""split feedpost media into feed_post_media
+
+Revision ID: c3d5e8f1a2b7
+Revises: 9a1f7d2e6c54
+Create Date: 2026-10-18 11:26:03.874410
+
+"""
+
+from typing import Sequence, Union
+from uuid import uuid4
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from src.campaign.constants import DEFAULT_IMAGE_CONTENT_TYPE
+from src.storage import get_blob_store
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d5e8f1a2b7"
+down_revision: Union[str, None] = "9a1f7d2e6c54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+feedpost = sa.table(
+    "feedpost",
+    sa.column("id", sa.Uuid()),
+    sa.column("media", postgresql.ARRAY(sa.LargeBinary(), zero_indexes=True)),
+)
+feed_post_media = sa.table(
+    "feed_post_media",
+    sa.column("id", sa.Uuid()),
+    sa.column("feed_post_id", sa.Uuid()),
+    sa.column("ordinal", sa.Integer()),
+    sa.column("digest", sa.String(64)),
+    sa.column("size", sa.Integer()),
+    sa.column("content_type", sa.String()),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_post_media",
+        sa.Column("feed_post_id", sa.Uuid(), nullable=False),
+        sa.Column("ordinal", sa.Integer(), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("update_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["feed_post_id"],
+            ["feedpost.id"],
+            name=op.f("feed_post_media_feed_post_id_fkey"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("feed_post_media_pkey")),
+    )
+    op.create_index(
+        "feed_post_media_feed_post_id_ordinal_idx",
+        "feed_post_media",
+        ["feed_post_id", "ordinal"],
+        unique=False,
+    )
+
+    # move the media of one feed post at a time to keep memory bounded
+    bind = op.get_bind()
+    store = get_blob_store()
+    feed_post_ids = bind.scalars(
+        sa.select(feedpost.c.id).where(feedpost.c.media.is_not(None))
+    ).all()
+    for feed_post_id in feed_post_ids:
+        media = bind.scalar(
+            sa.select(feedpost.c.media).where(feedpost.c.id == feed_post_id)
+        )
+        rows = []
+        for ordinal, medium in enumerate(media or []):
+            stored = store.put_sync(medium, DEFAULT_IMAGE_CONTENT_TYPE)
+            rows.append(
+                {
+                    "id": uuid4(),
+                    "feed_post_id": feed_post_id,
+                    "ordinal": ordinal,
+                    "digest": stored.digest,
+                    "size": stored.size,
+                    "content_type": stored.content_type,
+                }
+            )
+        if rows:
+            bind.execute(sa.insert(feed_post_media), rows)
+
+    op.drop_column("feedpost", "media")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "feedpost",
+        sa.Column(
+            "media",
+            postgresql.ARRAY(sa.LargeBinary(), zero_indexes=True),
+            nullable=True,
+        ),
+    )
+
+    bind = op.get_bind()
+    store = get_blob_store()
+    feed_post_ids = bind.scalars(
+        sa.select(feed_post_media.c.feed_post_id).distinct()
+    ).all()
+    for feed_post_id in feed_post_ids:
+        digests = bind.scalars(
+            sa.select(feed_post_media.c.digest)
+            .where(feed_post_media.c.feed_post_id == feed_post_id)
+            .order_by(feed_post_media.c.ordinal)
+        ).all()
+        bind.execute(
+            sa.update(feedpost)
+            .where(feedpost.c.id == feed_post_id)
+            .values(media=[store.read_sync(digest) for digest in digests])
+        )
+
+    op.drop_index(
+        "feed_post_media_feed_post_id_ordinal_idx", table_name="feed_post_media"
+    )
+    op.drop_table("feed_post_media")
@@ -0,0 +1,60 @@
+"""add campaign counter shard
+
+Revision ID: e2a6c9d4f817
+Revises: 7d4f1b6a9e20
+Create Date: 2026-10-18 14:37:40.518249
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a6c9d4f817"
+down_revision: Union[str, None] = "7d4f1b6a9e20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "campaign_counter_shard",
+        sa.Column("campaign_id", sa.Uuid(), nullable=False),
+        sa.Column("slot", sa.Integer(), nullable=False),
+        sa.Column("no_of_reactions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("no_of_supporters", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("amt_reached", sa.BigInteger(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(
+            ["campaign_id"],
+            ["campaign.id"],
+            name=op.f("campaign_counter_shard_campaign_id_fkey"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "campaign_id", "slot", name=op.f("campaign_counter_shard_pkey")
+        ),
+    )
+
+
+def downgrade() -> None:
+    # fold pending increments back into the campaign rows first
+    op.execute(
+        """
+        UPDATE campaign
+        SET no_of_reactions = campaign.no_of_reactions + pending.no_of_reactions,
+            no_of_supporters = campaign.no_of_supporters + pending.no_of_supporters,
+            amt_reached = campaign.amt_reached + pending.amt_reached
+        FROM (
+            SELECT campaign_id,
+                sum(no_of_reactions) AS no_of_reactions,
+                sum(no_of_supporters) AS no_of_supporters,
+                sum(amt_reached) AS amt_reached
+            FROM campaign_counter_shard
+            GROUP BY campaign_id
+        ) AS pending
+        WHERE campaign.id = pending.campaign_id
+        """
+    )
+    op.drop_table("campaign_counter_shard")
@@ -0,0 +1,79 @@
+"""
+Donation throughput against a single hot campaign: concurrent requests each
+record one donation in a transaction of their own, as save_donation does.
+
+Writes real donations to the campaign, so point DATABASE_URL at a
+development database.
+
+Usage: PYTHONPATH=. python scripts/bench_donations.py CAMPAIGN_ID
+    [--donations N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID, uuid4
+
+from src.campaign import leaderboard, service
+from src.campaign.models import CampaignRef
+from src.database import async_session, engine
+from src.redis import close_redis_client, init_redis_client
+
+
+async def donate(campaign: CampaignRef, slots: asyncio.Semaphore) -> float:
+    async with slots:
+        started_at = time.perf_counter()
+        async with async_session.begin() as db:
+            reference = f"bench-{uuid4().hex}"
+            await service.create_donation(
+                db,
+                reference,
+                reference,
+                1000,
+                "Bench Donor",
+                None,
+                False,
+                1234567890,
+                "Bench Bank",
+                "Bench Donor",
+                campaign,
+            )
+        await leaderboard.record_donation(campaign.id)
+        return time.perf_counter() - started_at
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("campaign_id", type=UUID)
+    parser.add_argument("--donations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    await init_redis_client()
+    try:
+        async with async_session() as db:
+            campaign = await service.get_campaign_ref(db, args.campaign_id)
+        if campaign is None:
+            raise SystemExit(f"campaign {args.campaign_id} does not exist")
+
+        slots = asyncio.Semaphore(args.concurrency)
+        started_at = time.perf_counter()
+        latencies = await asyncio.gather(
+            *(donate(campaign, slots) for _ in range(args.donations))
+        )
+        elapsed = time.perf_counter() - started_at
+    finally:
+        await close_redis_client()
+        await engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{args.donations} donations in {elapsed:.1f}s "
+        f"({args.donations / elapsed:.0f} donations/s), "
+        f"p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""
+Cost of authenticating a request's access token, with and without the
+verified token cache.
+
+Usage: PYTHONPATH=. python scripts/bench_jwt.py [--iterations N]
+"""
+
+import argparse
+import time
+from uuid import uuid4
+
+from src.user.dependencies import (
+    decode_access_token,
+    generate_access_token,
+    parse_access_token,
+)
+from src.user.models import Gender, User
+
+
+def time_per_call(func, access_token: str, iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        func(access_token)
+    return (time.perf_counter() - started_at) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    user = User(
+        id=uuid4(),
+        email="bench@example.com",
+        gender=Gender.female,
+        firstname="Bench",
+        lastname="Mark",
+        password="",
+    )
+    access_token = generate_access_token(user)
+
+    uncached = time_per_call(decode_access_token, access_token, args.iterations)
+    # the first call fills the cache, every later one is a hit
+    cached = time_per_call(parse_access_token, access_token, args.iterations)
+    print(f"decode and validate:  {uncached * 1e6:8.1f} us/token")
+    print(f"verified token cache: {cached * 1e6:8.1f} us/token")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
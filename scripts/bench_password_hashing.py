@@ -0,0 +1,95 @@
+"""
+/healthcheck latency while a storm of logins verifies bcrypt hashes, with
+bcrypt run inline on the event loop and on the password hashing pool.
+
+Usage: PYTHONPATH=. python scripts/bench_password_hashing.py [--logins N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src.main import app
+from src.user import security
+from src.user.exceptions import PasswordHashingUnavailable
+
+# seconds between healthcheck probes
+PROBE_INTERVAL = 0.01
+
+
+async def verify_inline(password: str, password_hash: str) -> None:
+    # what login did before the pool: bcrypt blocks the event loop. Yield
+    # first, so logins interleave with probes as concurrent requests would
+    await asyncio.sleep(0)
+    security.password_ctx.verify(password, password_hash)
+
+
+async def verify_on_pool(password: str, password_hash: str) -> None:
+    try:
+        await security.verify_and_update_password(password, password_hash)
+    except PasswordHashingUnavailable:
+        pass
+
+
+async def probe_healthcheck(
+    client: httpx.AsyncClient, until: asyncio.Event
+) -> list[float]:
+    """
+    Latency of each probe from the time it was due, so time spent waiting
+    for a blocked event loop counts
+    """
+    latencies: list[float] = []
+    due_at = time.perf_counter()
+    while True:
+        # a probe due while the loop was blocked still goes out afterwards
+        await client.get("/healthcheck")
+        latencies.append(time.perf_counter() - due_at)
+        if until.is_set():
+            return latencies
+        due_at = max(due_at + PROBE_INTERVAL, time.perf_counter())
+        await asyncio.sleep(due_at - time.perf_counter())
+
+
+async def run(verify, logins: int, password_hash: str) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        storm_done = asyncio.Event()
+        probes = asyncio.create_task(probe_healthcheck(client, storm_done))
+        await asyncio.sleep(PROBE_INTERVAL)
+        await asyncio.gather(
+            *(verify("password", password_hash) for _ in range(logins))
+        )
+        storm_done.set()
+        return await probes
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    return statistics.quantiles(latencies, n=100, method="inclusive")[
+        int(fraction * 100) - 1
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+
+    password_hash = security.password_ctx.hash("password")
+    for name, verify in (("inline", verify_inline), ("pool", verify_on_pool)):
+        latencies = await run(verify, args.logins, password_hash)
+        print(
+            f"{name:>6}: {len(latencies):4} probes, "
+            f"p50 {percentile(latencies, 0.5) * 1000:8.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms, "
+            f"max {max(latencies) * 1000:8.1f} ms"
+        )
+    security.shutdown_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
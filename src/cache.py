@@ -0,0 +1,258 @@
+"""
+In-process caches, and `two_tier_cache`: a per worker L1 in front of redis,
+invalidated across workers over pub/sub. Stats are served at `/metrics/cache`.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.redis import (
+    get_redis_client,
+    is_redis_configured,
+    mget,
+    mset_many,
+    pipeline,
+)
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+# seconds between polls of the invalidation subscription
+INVALIDATION_POLL_INTERVAL = 1.0
+
+_stats_registry: dict[str, "CacheStats"] = {}
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+def register_stats(name: str) -> CacheStats:
+    """Return the stats registered under `name`, creating them on first use"""
+    return _stats_registry.setdefault(name, CacheStats())
+
+
+def get_cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: stats.as_dict() for name, stats in _stats_registry.items()}
+
+
+class TTLLRUCache(Generic[K, V]):
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = register_stats(name)
+        # key -> (expiry on the monotonic clock, value), least recently used first
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight(Generic[T]):
+    """
+    At most one run per key at a time: callers arriving while a run is in
+    flight wait for it and share its result. Runs are tasks of their own, so
+    a cancelled caller never cancels the run the others wait for.
+    """
+
+    def __init__(self) -> None:
+        self._runs: dict[Hashable, asyncio.Task[T]] = {}
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> asyncio.Task[T]:
+        run = self._runs.get(key)
+        if run is None:
+            run = asyncio.ensure_future(func())
+            self._runs[key] = run
+            run.add_done_callback(lambda _: self._finish(key, run))
+        return run
+
+    def _finish(self, key: Hashable, run: asyncio.Task[T]) -> None:
+        if self._runs.get(key) is run:
+            del self._runs[key]
+        if not run.cancelled() and (error := run.exception()):
+            logger.warning("single flight run %s failed: %r", key, error)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, func))
+
+
+_two_tier_caches: dict[str, "TwoTierCache[Any]"] = {}
+
+
+class TwoTierCache(Generic[T]):
+    """
+    Results of `func(db, *args)` keyed by `args`; a None result (e.g. not
+    found) is never cached.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Awaitable[T | None]],
+        name: str,
+        value_type: Any,
+        ttl: int,
+        local_ttl: int,
+        maxsize: int,
+    ) -> None:
+        self.func = func
+        self.name = name
+        self.ttl = ttl
+        self.adapter: TypeAdapter[T] = TypeAdapter(value_type)
+        self.local: TTLLRUCache[str, T] = TTLLRUCache(name, maxsize, local_ttl)
+        self.redis_stats = register_stats(f"{name}:redis")
+        _two_tier_caches[name] = self
+
+    def redis_key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def __call__(self, db: AsyncSession, *args: Hashable) -> T | None:
+        key = ":".join(map(str, args))
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        if is_redis_configured():
+            try:
+                [value] = await mget(self.adapter, [self.redis_key(key)])
+            except RedisError as error:
+                logger.warning("%s cache unavailable: %r", self.name, error)
+            if value is not None:
+                self.redis_stats.hits += 1
+                self.local.set(key, value)
+                return value
+            self.redis_stats.misses += 1
+
+        value = await self.func(db, *args)
+        if value is not None:
+            self.local.set(key, value)
+            try:
+                await mset_many(self.adapter, {self.redis_key(key): value}, self.ttl)
+            except RedisError as error:
+                logger.warning("failed to cache %s: %r", self.name, error)
+        return value
+
+    async def invalidate(self, *args: Hashable) -> None:
+        """
+        Drop the entry for `args` from redis and from every worker; call it
+        after the change committed, e.g. from a background task.
+        """
+        key = ":".join(map(str, args))
+        self.local.delete(key)
+        if not is_redis_configured():
+            return
+        try:
+            async with pipeline() as pipe:
+                pipe.delete(self.redis_key(key))
+                pipe.publish(INVALIDATION_CHANNEL, f"{self.name} {key}")
+        except RedisError as error:
+            logger.warning("failed to invalidate %s: %r", self.name, error)
+
+
+def two_tier_cache(
+    name: str, value_type: Any, ttl: int, local_ttl: int, maxsize: int
+) -> Callable[[Callable[..., Awaitable[T | None]]], TwoTierCache[T]]:
+    """
+    Cache a service function taking the session and then hashable arguments,
+    e.g. `get_campaign_ref(db, campaign_id)`. Values are stored in redis
+    through a `TypeAdapter` of `value_type`.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T | None]]) -> TwoTierCache[T]:
+        return TwoTierCache(func, name, value_type, ttl, local_ttl, maxsize)
+
+    return decorator
+
+
+def drop_local_entry(message: bytes) -> None:
+    name, _, key = message.decode().partition(" ")
+    if cache := _two_tier_caches.get(name):
+        cache.local.delete(key)
+
+
+async def listen_for_invalidations() -> None:
+    """Background task started by the app lifespan"""
+    if not is_redis_configured():
+        return
+    while True:
+        try:
+            async with get_redis_client().pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=INVALIDATION_POLL_INTERVAL,
+                    )
+                    if message is not None:
+                        drop_local_entry(message["data"])
+        except RedisError as error:
+            logger.warning("cache invalidation subscription lost: %r", error)
+        # invalidations may have been missed while disconnected
+        for cache in _two_tier_caches.values():
+            cache.local.clear()
+        await asyncio.sleep(INVALIDATION_POLL_INTERVAL)
@@ -0,0 +1,187 @@
+"""
+Campaign maintenance commands.
+
+Usage: python -m src.campaign.cli <command> [options]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Sequence
+from pathlib import Path
+from uuid import UUID
+
+from src.campaign import counters, exceptions, images, ingest, leaderboard, service
+from src.campaign.constants import IngestFormat
+from src.config import settings
+from src.database import async_session
+from src.redis import close_redis_client, init_redis_client, is_redis_configured
+
+
+async def backfill_image_variants(batch_size: int) -> None:
+    processed = failed = 0
+    after_id: UUID | None = None
+    while True:
+        backfilled: list[tuple[UUID, UUID | None]] = []
+        async with async_session.begin() as db:
+            campaigns = await service.retrieve_campaigns_without_header_img_variants(
+                db, after_id, batch_size
+            )
+            if not campaigns:
+                break
+            # the whole batch is rendered concurrently by the process pool
+            results = await asyncio.gather(
+                *(service.add_header_img_variants(campaign) for campaign in campaigns),
+                return_exceptions=True,
+            )
+            for campaign, result in zip(campaigns, results):
+                if isinstance(result, (exceptions.InvalidImage, FileNotFoundError)):
+                    failed += 1
+                    print(f"skipped campaign {campaign.id}: {result!r}")
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    processed += 1
+                    backfilled.append((campaign.id, campaign.creator_id))
+            after_id = campaigns[-1].id
+        # the batch is committed, drop its cached cards and details
+        for campaign_id, creator_id in backfilled:
+            await service.invalidate_campaign(campaign_id, creator_id)
+
+    print(f"backfilled image variants for {processed} campaigns, {failed} skipped")
+
+
+async def rebuild_leaderboard() -> None:
+    if not is_redis_configured():
+        print("redis is not configured, there is no leaderboard to rebuild")
+        return
+    async with async_session() as db:
+        count = await leaderboard.rebuild(db)
+    print(f"rebuilt the campaign leaderboard with {count} campaigns")
+
+
+async def compact_counters() -> None:
+    async with async_session.begin() as db:
+        compacted = await counters.compact(db)
+    print(f"compacted counter shards into {compacted} campaigns")
+
+
+async def reconcile_counters(batch_size: int) -> None:
+    checked = corrected = 0
+    after_id: UUID | None = None
+    started = time.perf_counter()
+    while True:
+        async with async_session.begin() as db:
+            after_id, batch_checked, batch_corrected = await counters.reconcile(
+                db, after_id, batch_size
+            )
+        if after_id is None:
+            break
+        checked += batch_checked
+        corrected += batch_corrected
+    elapsed = time.perf_counter() - started
+
+    # corrected scores only reach redis through a rebuild
+    if corrected and is_redis_configured():
+        async with async_session() as db:
+            await leaderboard.rebuild(db)
+    print(
+        f"checked {checked} campaigns, corrected {corrected} "
+        f"in {elapsed:.1f}s ({checked / elapsed:.0f} campaigns/s)"
+    )
+
+
+async def file_lines(path: Path) -> AsyncIterator[str]:
+    with path.open(encoding="utf-8", newline="") as file:
+        for line in file:
+            yield line.rstrip("\r\n")
+
+
+async def ingest_donations(
+    path: Path, ingest_format: IngestFormat, batch_size: int
+) -> None:
+    result = await ingest.ingest_donations(file_lines(path), ingest_format, batch_size)
+    for line, detail in result.errors:
+        print(f"line {line}: {detail}")
+    print(
+        f"ingested {result.inserted} donations, {result.duplicates} duplicates "
+        f"skipped, {len(result.errors)} rejected"
+    )
+
+
+async def run(command: Awaitable[None]) -> None:
+    # redis is set up here so commands keep the leaderboard and card cache fresh
+    await init_redis_client()
+    try:
+        await command
+    finally:
+        await close_redis_client()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.campaign.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = commands.add_parser(
+        "backfill-image-variants",
+        help="Render header image variants for campaigns created before them",
+    )
+    backfill_parser.add_argument("--batch-size", type=int, default=50)
+
+    commands.add_parser(
+        "rebuild-leaderboard",
+        help="Rebuild the redis leaderboard of hot campaigns from the database",
+    )
+
+    commands.add_parser(
+        "compact-counters",
+        help="Fold pending campaign counter shards into the campaign rows",
+    )
+
+    reconcile_parser = commands.add_parser(
+        "reconcile-counters",
+        help="Recompute campaign counters from the donation and reaction tables",
+    )
+    reconcile_parser.add_argument("--batch-size", type=int, default=500)
+
+    ingest_parser = commands.add_parser(
+        "ingest-donations",
+        help="Ingest donations from an NDJSON or CSV (with header row) file",
+    )
+    ingest_parser.add_argument("path", type=Path)
+    ingest_parser.add_argument(
+        "--format",
+        choices=[ingest_format.value for ingest_format in IngestFormat],
+        help="defaults to the file extension",
+    )
+    ingest_parser.add_argument(
+        "--batch-size", type=int, default=settings.DONATION_INGEST_BATCH_SIZE
+    )
+
+    args = parser.parse_args(argv)
+    try:
+        match args.command:
+            case "backfill-image-variants":
+                asyncio.run(run(backfill_image_variants(args.batch_size)))
+            case "rebuild-leaderboard":
+                asyncio.run(run(rebuild_leaderboard()))
+            case "compact-counters":
+                asyncio.run(run(compact_counters()))
+            case "reconcile-counters":
+                asyncio.run(run(reconcile_counters(args.batch_size)))
+            case "ingest-donations":
+                try:
+                    ingest_format = IngestFormat(
+                        args.format or args.path.suffix.lstrip(".").lower()
+                    )
+                except ValueError:
+                    parser.error("pass --format, it can't be told from the extension")
+                asyncio.run(
+                    run(ingest_donations(args.path, ingest_format, args.batch_size))
+                )
+    finally:
+        images.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
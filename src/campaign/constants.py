@@ -1,10 +1,72 @@
 from enum import Enum
 from typing import Final
 
+DEFAULT_IMAGE_CONTENT_TYPE: Final[str] = "application/octet-stream"
+
+# media urls carry a content version, so a versioned response never changes
+IMMUTABLE_CACHE_CONTROL: Final[str] = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL: Final[str] = "public, no-cache"
+MEDIA_VERSION_LENGTH: Final[int] = 16
+
+
+class ImageVariant(str, Enum):
+    THUMBNAIL = "thumbnail"
+    CARD = "card"
+    FULL = "full"
+
+
+# bounding boxes - variants keep the aspect ratio of the uploaded image
+IMAGE_VARIANT_MAX_SIZES: Final[dict[ImageVariant, tuple[int, int]]] = {
+    ImageVariant.THUMBNAIL: (160, 160),
+    ImageVariant.CARD: (480, 480),
+    ImageVariant.FULL: (1600, 1600),
+}
+IMAGE_VARIANT_FORMAT: Final[str] = "WEBP"
+IMAGE_VARIANT_CONTENT_TYPE: Final[str] = "image/webp"
+IMAGE_VARIANT_QUALITY: Final[int] = 80
+
+
+NDJSON_MEDIA_TYPE: Final[str] = "application/x-ndjson"
+DONATION_STREAM_BATCH_SIZE: Final[int] = 500
+
+
+class IngestFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+INGEST_FORMAT_CONTENT_TYPES: Final[dict[str, IngestFormat]] = {
+    NDJSON_MEDIA_TYPE: IngestFormat.NDJSON,
+    "application/jsonl": IngestFormat.NDJSON,
+    "text/csv": IngestFormat.CSV,
+}
+# list cells of csv files, e.g. social media links
+CSV_LIST_SEPARATOR: Final[str] = ";"
+# spreadsheets run exported cells starting with these as formulas
+CSV_FORMULA_PREFIXES: Final[tuple[str, ...]] = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+EXPORT_FORMAT_MEDIA_TYPES: Final[dict[ExportFormat, str]] = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: NDJSON_MEDIA_TYPE,
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
 
 class ErrorMessage:
     CAMPAIGN_NOT_FOUND: Final[str] = "Campaign Not Found."
     FEED_NOT_FOUND: Final[str] = "Feed Post Not Found."
+    FEED_POST_MEDIUM_NOT_FOUND: Final[str] = "Feed Post Medium Not Found."
+    INVALID_IMAGE: Final[str] = "Invalid Image."
+    INVALID_INGEST_API_KEY: Final[str] = "Invalid Ingest API Key."
+    EXPORT_FORMAT_UNAVAILABLE: Final[str] = "Export Format Unavailable."
+    UNSUPPORTED_INGEST_FORMAT: Final[str] = "Unsupported Ingest Format."
     USER_ALREADY_REACTED: Final[str] = "User Already Reacted."
     USER_NOT_CAMPAIGN_CREATOR: Final[str] = "User Not Campaign Creator."
     USER_NOT_FEED_POST_CREATOR: Final[str] = "User Not Feed Post Creator."
@@ -0,0 +1,258 @@
+"""
+Campaign counters sharded over `campaign_counter_shard` rows; `compact`
+folds the shards back into the campaign columns.
+"""
+
+import asyncio
+import logging
+import random
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import BigInteger, delete, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.selectable import Select
+
+from src.campaign.models import (
+    Campaign,
+    CampaignCounterShard,
+    Donation,
+    UserCampaignReaction,
+)
+from src.config import settings
+from src.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignCounters(NamedTuple):
+    no_of_reactions: int = 0
+    no_of_supporters: int = 0
+    amt_reached: int = 0
+
+
+def random_slot() -> int:
+    return random.randrange(settings.CAMPAIGN_COUNTER_SHARDS)
+
+
+def upsert_shard(rows: Select, columns: list[str]):
+    """
+    `INSERT ... SELECT ... ON CONFLICT DO UPDATE` adding the selected
+    increments to their shard; `rows` selects the campaign id, slot and then
+    one value per counter in `columns`.
+    """
+    statement = insert(CampaignCounterShard).from_select(
+        ["campaign_id", "slot", *columns], rows
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[CampaignCounterShard.campaign_id, CampaignCounterShard.slot],
+        set_={
+            column: getattr(CampaignCounterShard, column)
+            + getattr(statement.excluded, column)
+            for column in columns
+        },
+    )
+
+
+async def increment(
+    db: AsyncSession,
+    campaign_id: UUID,
+    no_of_reactions: int = 0,
+    no_of_supporters: int = 0,
+    amt_reached: int = 0,
+) -> None:
+    increments = {
+        column: value
+        for column, value in (
+            ("no_of_reactions", no_of_reactions),
+            ("no_of_supporters", no_of_supporters),
+            ("amt_reached", amt_reached),
+        )
+        if value
+    }
+    if not increments:
+        return
+    await db.execute(
+        upsert_shard(
+            select(
+                literal(campaign_id),
+                literal(random_slot()),
+                *(literal(value, BigInteger) for value in increments.values()),
+            ),
+            list(increments),
+        )
+    )
+
+
+async def get_pending(
+    db: AsyncSession, campaign_ids: list[UUID]
+) -> dict[UUID, CampaignCounters]:
+    if not campaign_ids:
+        return {}
+    query_result = await db.execute(
+        select(
+            CampaignCounterShard.campaign_id,
+            func.sum(CampaignCounterShard.no_of_reactions),
+            func.sum(CampaignCounterShard.no_of_supporters),
+            func.sum(CampaignCounterShard.amt_reached),
+        )
+        .where(CampaignCounterShard.campaign_id.in_(campaign_ids))
+        .group_by(CampaignCounterShard.campaign_id)
+    )
+    return {
+        campaign_id: CampaignCounters(
+            int(no_of_reactions), int(no_of_supporters), int(amt_reached)
+        )
+        for campaign_id, no_of_reactions, no_of_supporters, amt_reached in query_result
+    }
+
+
+def pending_subquery(campaign_ids: list[UUID] | None = None):
+    """Pending increments per campaign, to outer join against `campaign`"""
+    query = select(
+        CampaignCounterShard.campaign_id,
+        func.sum(CampaignCounterShard.no_of_reactions).label("no_of_reactions"),
+        func.sum(CampaignCounterShard.no_of_supporters).label("no_of_supporters"),
+        func.sum(CampaignCounterShard.amt_reached).label("amt_reached"),
+    ).group_by(CampaignCounterShard.campaign_id)
+    if campaign_ids is not None:
+        query = query.where(CampaignCounterShard.campaign_id.in_(campaign_ids))
+    return query.subquery("pending")
+
+
+async def compact(db: AsyncSession) -> int:
+    """
+    Fold every shard into its campaign row in a single statement. Shards are
+    deleted as they are read, so increments made meanwhile land in new shard
+    rows and are picked up by the next run. Returns the number of campaigns
+    updated.
+    """
+    folded = (
+        delete(CampaignCounterShard)
+        .returning(
+            CampaignCounterShard.campaign_id,
+            CampaignCounterShard.no_of_reactions,
+            CampaignCounterShard.no_of_supporters,
+            CampaignCounterShard.amt_reached,
+        )
+        .cte("folded")
+    )
+    totals = (
+        select(
+            folded.c.campaign_id,
+            func.sum(folded.c.no_of_reactions).label("no_of_reactions"),
+            func.sum(folded.c.no_of_supporters).label("no_of_supporters"),
+            func.sum(folded.c.amt_reached).label("amt_reached"),
+        )
+        .group_by(folded.c.campaign_id)
+        .subquery("totals")
+    )
+    query_result = await db.execute(
+        update(Campaign)
+        .where(Campaign.id == totals.c.campaign_id)
+        .values(
+            no_of_reactions=Campaign.no_of_reactions + totals.c.no_of_reactions,
+            no_of_supporters=Campaign.no_of_supporters + totals.c.no_of_supporters,
+            amt_reached=Campaign.amt_reached + totals.c.amt_reached,
+        )
+        .returning(Campaign.id)
+        .execution_options(synchronize_session=False)
+    )
+    return len(query_result.all())
+
+
+async def compact_periodically(interval: int) -> None:
+    """Background task started by the app lifespan"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session.begin() as db:
+                await compact(db)
+        except SQLAlchemyError as error:
+            logger.warning("campaign counter compaction failed: %r", error)
+
+
+async def reconcile(
+    db: AsyncSession, after_id: UUID | None, limit: int
+) -> tuple[UUID | None, int, int]:
+    """
+    Recompute the counters of the next `limit` campaigns (by id) from the
+    donation and reaction tables, correcting the rows that drifted.
+
+    Only the chunk's campaign rows are locked, and only for this transaction;
+    holding them also keeps compaction from moving shards into the rows while
+    they are recomputed. Returns the last id checked (None once every
+    campaign was checked), the number of campaigns checked and the number
+    corrected.
+    """
+    chunk_query = select(Campaign.id).order_by(Campaign.id).limit(limit)
+    if after_id:
+        chunk_query = chunk_query.where(Campaign.id > after_id)
+    campaign_ids = list((await db.scalars(chunk_query.with_for_update())).all())
+    if not campaign_ids:
+        return None, 0, 0
+
+    donations = (
+        select(
+            Donation.campaign_id,
+            func.count().label("no_of_supporters"),
+            func.sum(Donation.amount).label("amt_reached"),
+        )
+        .where(Donation.campaign_id.in_(campaign_ids))
+        .group_by(Donation.campaign_id)
+        .subquery("donations")
+    )
+    reactions = (
+        select(
+            UserCampaignReaction.campaign_id,
+            func.count().label("no_of_reactions"),
+        )
+        .where(UserCampaignReaction.campaign_id.in_(campaign_ids))
+        .group_by(UserCampaignReaction.campaign_id)
+        .subquery("reactions")
+    )
+    pending = pending_subquery(campaign_ids)
+    # the campaign columns hold everything that is not pending in a shard
+    expected = (
+        select(
+            Campaign.id,
+            (
+                func.coalesce(reactions.c.no_of_reactions, 0)
+                - func.coalesce(pending.c.no_of_reactions, 0)
+            ).label("no_of_reactions"),
+            (
+                func.coalesce(donations.c.no_of_supporters, 0)
+                - func.coalesce(pending.c.no_of_supporters, 0)
+            ).label("no_of_supporters"),
+            (
+                func.coalesce(donations.c.amt_reached, 0)
+                - func.coalesce(pending.c.amt_reached, 0)
+            ).label("amt_reached"),
+        )
+        .outerjoin(donations, donations.c.campaign_id == Campaign.id)
+        .outerjoin(reactions, reactions.c.campaign_id == Campaign.id)
+        .outerjoin(pending, pending.c.campaign_id == Campaign.id)
+        .where(Campaign.id.in_(campaign_ids))
+        .subquery("expected")
+    )
+    query_result = await db.execute(
+        update(Campaign)
+        .where(
+            Campaign.id == expected.c.id,
+            or_(
+                Campaign.no_of_reactions != expected.c.no_of_reactions,
+                Campaign.no_of_supporters != expected.c.no_of_supporters,
+                Campaign.amt_reached != expected.c.amt_reached,
+            ),
+        )
+        .values(
+            no_of_reactions=expected.c.no_of_reactions,
+            no_of_supporters=expected.c.no_of_supporters,
+            amt_reached=expected.c.amt_reached,
+        )
+        .returning(Campaign.id)
+        .execution_options(synchronize_session=False)
+    )
+    return campaign_ids[-1], len(campaign_ids), len(query_result.all())
@@ -1,14 +1,16 @@
+import secrets
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends
+from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from src.campaign import exceptions, service
-from src.campaign.models import Campaign, FeedPost
+from src.campaign.models import Campaign, CampaignRef, FeedPost
+from src.config import settings
 from src.database import session
 from src.user.dependencies import validate_user_access_token
-from src.user.models import User
+from src.user.models import UserIdentity
 
 
 async def validate_campaign_exist(
@@ -20,6 +22,19 @@ async def validate_campaign_exist(
     raise exceptions.CampaignNotFound()
 
 
+async def validate_campaign_ref_exist(
+    db: Annotated[AsyncSession, Depends(session)], campaign_id: UUID
+) -> CampaignRef:
+    """
+    Existence check for endpoints that only need the campaign's id, creator,
+    progress or deadline; never loads the campaign row itself.
+    """
+    campaign_ref = await service.get_campaign_ref(db, campaign_id)
+    if campaign_ref:
+        return campaign_ref
+    raise exceptions.CampaignNotFound()
+
+
 async def validate_feed_post_exist(
     db: Annotated[AsyncSession, Depends(session)], feed_post_id: UUID
 ):
@@ -29,29 +44,24 @@ async def validate_feed_post_exist(
     raise exceptions.FeedNotFound()
 
 
-async def validate_user_not_already_reacted_to_campaign(
-    db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(validate_campaign_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
-) -> None:
-    if await service.user_reaction_to_campaign_exists(db, campaign, user):
-        raise exceptions.UserAlreadyReacted()
-    return
-
-
-async def validate_user_not_already_reacted_to_feed_post(
-    db: Annotated[AsyncSession, Depends(session)],
-    feed_post: Annotated[FeedPost, Depends(validate_feed_post_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+async def validate_ingest_api_key(
+    x_api_key: Annotated[str | None, Header()] = None,
 ) -> None:
-    if await service.user_reaction_to_feed_post_exists(db, feed_post, user):
-        raise exceptions.UserAlreadyReacted()
+    ingest_api_key = settings.DONATION_INGEST_API_KEY
+    if (
+        ingest_api_key is None
+        or x_api_key is None
+        or not secrets.compare_digest(
+            x_api_key.encode(), ingest_api_key.get_secret_value().encode()
+        )
+    ):
+        raise exceptions.InvalidIngestApiKey()
     return
 
 
 async def validate_user_created_campaign(
-    campaign: Annotated[Campaign, Depends(validate_campaign_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    campaign: Annotated[CampaignRef, Depends(validate_campaign_ref_exist)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
 ):
     if user.id != campaign.creator_id:
         raise exceptions.UserNotCampaignCreator()
@@ -60,7 +70,7 @@ async def validate_user_created_campaign(
 
 async def validate_user_created_feed_post(
     feed_post: Annotated[FeedPost, Depends(validate_feed_post_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
 ):
     if user.id != feed_post.creator_id:
         raise exceptions.UserNotFeedPostCreator()
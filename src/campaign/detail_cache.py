@@ -0,0 +1,155 @@
+"""
+Serialized campaign detail responses in redis, served stale while one worker
+rebuilds them.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from src.cache import SingleFlight, register_stats
+from src.config import settings
+from src.redis import (
+    delete_by_key,
+    get_redis_client,
+    is_redis_configured,
+    mget,
+    mset_many,
+    release_lock,
+)
+
+logger = logging.getLogger(__name__)
+
+DETAIL_KEY = "campaign:detail:{}"
+DETAIL_LOCK_KEY = "campaign:detail:{}:lock"
+# seconds between checks for a body another worker is building
+LOCK_POLL_INTERVAL = 0.05
+
+
+class DetailBody(NamedTuple):
+    built_at: float
+    body: bytes
+
+
+DetailBuilder = Callable[[], Awaitable[bytes | None]]
+
+_body_adapter = TypeAdapter(DetailBody)
+_builds: SingleFlight[bytes | None] = SingleFlight()
+_stats = register_stats("campaign_detail")
+
+
+def detail_key(campaign_id: UUID) -> str:
+    return DETAIL_KEY.format(campaign_id)
+
+
+async def get_cached_body(campaign_id: UUID) -> DetailBody | None:
+    try:
+        [detail_body] = await mget(_body_adapter, [detail_key(campaign_id)])
+    except RedisError as error:
+        logger.warning("campaign detail cache unavailable: %r", error)
+        return None
+    return detail_body
+
+
+async def store_body(campaign_id: UUID, body: bytes) -> None:
+    try:
+        await mset_many(
+            _body_adapter,
+            {detail_key(campaign_id): DetailBody(time.time(), body)},
+            ttl=settings.CAMPAIGN_DETAIL_FRESH_TTL + settings.CAMPAIGN_DETAIL_STALE_TTL,
+        )
+    except RedisError as error:
+        logger.warning("failed to cache campaign detail: %r", error)
+
+
+async def acquire_build_lock(campaign_id: UUID) -> str | None:
+    """Return the lock token, or None when another worker holds the lock"""
+    token = uuid4().hex
+    if not is_redis_configured():
+        return token
+    try:
+        acquired = await get_redis_client().set(
+            DETAIL_LOCK_KEY.format(campaign_id),
+            token,
+            nx=True,
+            px=int(settings.CAMPAIGN_DETAIL_LOCK_TIMEOUT * 1000),
+        )
+    except RedisError as error:
+        logger.warning("campaign detail build lock unavailable: %r", error)
+        # build without the lock rather than not at all
+        return token
+    return token if acquired else None
+
+
+async def release_build_lock(campaign_id: UUID, token: str) -> None:
+    try:
+        await release_lock(DETAIL_LOCK_KEY.format(campaign_id), token)
+    except RedisError as error:
+        logger.warning("failed to release campaign detail build lock: %r", error)
+
+
+async def build(campaign_id: UUID, builder: DetailBuilder) -> bytes | None:
+    token = await acquire_build_lock(campaign_id)
+    if token is None:
+        # another worker is building it, wait for its body
+        deadline = time.monotonic() + settings.CAMPAIGN_DETAIL_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            if detail_body := await get_cached_body(campaign_id):
+                return detail_body.body
+        token = await acquire_build_lock(campaign_id)
+
+    try:
+        body = await builder()
+        if body is not None:
+            await store_body(campaign_id, body)
+        return body
+    finally:
+        if token is not None:
+            await release_build_lock(campaign_id, token)
+
+
+async def refresh(campaign_id: UUID, builder: DetailBuilder) -> bytes | None:
+    """Rebuild a stale body, unless another worker already does"""
+    token = await acquire_build_lock(campaign_id)
+    if token is None:
+        return None
+    try:
+        body = await builder()
+        if body is not None:
+            await store_body(campaign_id, body)
+        return body
+    finally:
+        await release_build_lock(campaign_id, token)
+
+
+async def get_body(campaign_id: UUID, builder: DetailBuilder) -> bytes | None:
+    """
+    The campaign's detail body, from the cache or built with `builder`
+    (None when the campaign does not exist). `builder` must not depend on
+    the request's session: the build it starts is shared with other
+    requests and may outlive this one.
+    """
+    detail_body = await get_cached_body(campaign_id)
+    if detail_body is None:
+        _stats.misses += 1
+        return await _builds.run(campaign_id, lambda: build(campaign_id, builder))
+
+    _stats.hits += 1
+    if time.time() - detail_body.built_at > settings.CAMPAIGN_DETAIL_FRESH_TTL:
+        _stats.expirations += 1
+        _builds.start(campaign_id, lambda: refresh(campaign_id, builder))
+    return detail_body.body
+
+
+async def invalidate(campaign_id: UUID) -> None:
+    try:
+        await delete_by_key(detail_key(campaign_id))
+    except RedisError as error:
+        logger.warning("failed to invalidate campaign detail: %r", error)
@@ -1,5 +1,12 @@
+from fastapi import status
+
 from src.campaign.constants import ErrorMessage
-from src.exceptions import BadRequest, NotFound, PermissionDenied
+from src.exceptions import (
+    BadRequest,
+    DetailedHTTPException,
+    NotFound,
+    PermissionDenied,
+)
 
 
 class CampaignNotFound(NotFound):
@@ -10,6 +17,27 @@ class FeedNotFound(NotFound):
     DETAIL = ErrorMessage.FEED_NOT_FOUND
 
 
+class FeedPostMediumNotFound(NotFound):
+    DETAIL = ErrorMessage.FEED_POST_MEDIUM_NOT_FOUND
+
+
+class InvalidImage(BadRequest):
+    DETAIL = ErrorMessage.INVALID_IMAGE
+
+
+class ExportFormatUnavailable(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_501_NOT_IMPLEMENTED
+    DETAIL = ErrorMessage.EXPORT_FORMAT_UNAVAILABLE
+
+
+class InvalidIngestApiKey(PermissionDenied):
+    DETAIL = ErrorMessage.INVALID_INGEST_API_KEY
+
+
+class UnsupportedIngestFormat(BadRequest):
+    DETAIL = ErrorMessage.UNSUPPORTED_INGEST_FORMAT
+
+
 class UserAlreadyReacted(BadRequest):
     DETAIL = ErrorMessage.USER_ALREADY_REACTED
 
@@ -0,0 +1,161 @@
+"""Streaming donation exports; parquet needs the optional `export` extra"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Row, select
+
+from src.campaign import exceptions
+from src.campaign.constants import (
+    CSV_FORMULA_PREFIXES,
+    CSV_LIST_SEPARATOR,
+    DONATION_STREAM_BATCH_SIZE,
+    ExportFormat,
+)
+from src.campaign.models import Donation
+from src.database import async_session
+
+EXPORT_COLUMNS = (
+    Donation.id,
+    Donation.created_at,
+    Donation.amount,
+    Donation.anonymous,
+    Donation.name,
+    Donation.social_media_link,
+    Donation.payaza_reference,
+    Donation.transaction_reference,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+DonationBatches = AsyncIterator[list[dict[str, Any]]]
+
+
+async def iter_donation_batches(campaign_id: UUID) -> DonationBatches:
+    # runs while the response is sent, after the request's session is closed
+    async with async_session.begin() as db:
+        result = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .where(Donation.campaign_id == campaign_id)
+            .order_by(Donation.created_at, Donation.id)
+            .execution_options(yield_per=DONATION_STREAM_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield [export_row(row) for row in rows]
+
+
+def export_row(row: Row[Any]) -> dict[str, Any]:
+    donation = row._asdict()
+    donation["id"] = str(donation["id"])
+    # anonymous donors are never named
+    if donation["anonymous"]:
+        donation["name"] = donation["social_media_link"] = None
+    return donation
+
+
+def escape_csv_cell(value: Any) -> Any:
+    # donor supplied text is quoted so spreadsheets show it instead of running it
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def encode_csv(batches: DonationBatches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_FIELDS)
+    writer.writeheader()
+    async for rows in batches:
+        for row in rows:
+            cells = {
+                **row,
+                "social_media_link": CSV_LIST_SEPARATOR.join(
+                    row["social_media_link"] or []
+                ),
+            }
+            writer.writerow(
+                {field: escape_csv_cell(value) for field, value in cells.items()}
+            )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # a header alone, for campaigns without donations
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(batches: DonationBatches) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(json.dumps(jsonable_encoder(row)) + "\n" for row in rows).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file handing out what was written since the last `drain`"""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_encoder() -> Callable[[DonationBatches], AsyncIterator[bytes]]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise exceptions.ExportFormatUnavailable()
+
+    schema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("amount", pa.int64()),
+            ("anonymous", pa.bool_()),
+            ("name", pa.string()),
+            ("social_media_link", pa.list_(pa.string())),
+            ("payaza_reference", pa.string()),
+            ("transaction_reference", pa.string()),
+        ]
+    )
+
+    async def encode_parquet(batches: DonationBatches) -> AsyncIterator[bytes]:
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            async for rows in batches:
+                # one row group per batch
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                yield sink.drain()
+        # footer
+        yield sink.drain()
+
+    return encode_parquet
+
+
+def get_encoder(
+    export_format: ExportFormat,
+) -> Callable[[DonationBatches], AsyncIterator[bytes]]:
+    match export_format:
+        case ExportFormat.CSV:
+            return encode_csv
+        case ExportFormat.NDJSON:
+            return encode_ndjson
+        case ExportFormat.PARQUET:
+            return parquet_encoder()
@@ -0,0 +1,58 @@
+"""
+Redis fast path for retried donation notifications; the unique references on
+`donation` are what actually prevent duplicates.
+"""
+
+import logging
+from collections.abc import Iterable
+
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.redis import get_redis_client, is_redis_configured, pipeline
+
+logger = logging.getLogger(__name__)
+
+DONATION_REFERENCE_KEY = "donation:reference:{}"
+CLAIMED = b"claimed"
+RECORDED = b"recorded"
+
+
+def donation_reference_key(payaza_reference: str) -> str:
+    return DONATION_REFERENCE_KEY.format(payaza_reference)
+
+
+async def claim_donation(payaza_reference: str) -> bool:
+    """
+    Return False when the donation is known to be recorded already. Any other
+    outcome, redis errors included, sends the request down the database path.
+    """
+    if not is_redis_configured():
+        return True
+    key = donation_reference_key(payaza_reference)
+    try:
+        client = get_redis_client()
+        if await client.set(
+            key, CLAIMED, nx=True, ex=settings.DONATION_IDEMPOTENCY_CLAIM_TTL
+        ):
+            return True
+        return await client.get(key) != RECORDED
+    except RedisError as error:
+        logger.warning("donation idempotency check unavailable: %r", error)
+        return True
+
+
+async def mark_donations_recorded(payaza_references: Iterable[str]) -> None:
+    """Call only once the donations are committed"""
+    if not is_redis_configured():
+        return
+    try:
+        async with pipeline() as pipe:
+            for payaza_reference in payaza_references:
+                pipe.set(
+                    donation_reference_key(payaza_reference),
+                    RECORDED,
+                    ex=settings.DONATION_IDEMPOTENCY_TTL,
+                )
+    except RedisError as error:
+        logger.warning("failed to mark donations recorded: %r", error)
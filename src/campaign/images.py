@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.campaign import exceptions
+from src.campaign.constants import (
+    IMAGE_VARIANT_FORMAT,
+    IMAGE_VARIANT_MAX_SIZES,
+    IMAGE_VARIANT_QUALITY,
+    ImageVariant,
+)
+from src.config import settings
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def render_variants(source: bytes | str) -> dict[ImageVariant, bytes]:
+    """
+    Decode an uploaded image (raw bytes or a file path) and re-encode it into
+    every fixed size variant.
+    CPU bound - runs inside a worker process, never on the event loop.
+    """
+    with Image.open(
+        BytesIO(source) if isinstance(source, bytes) else source
+    ) as uploaded_image:
+        image = ImageOps.exif_transpose(uploaded_image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        variants: dict[ImageVariant, bytes] = {}
+        for variant, max_size in IMAGE_VARIANT_MAX_SIZES.items():
+            resized_image = image.copy()
+            resized_image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized_image.save(
+                buffer, format=IMAGE_VARIANT_FORMAT, quality=IMAGE_VARIANT_QUALITY
+            )
+            variants[variant] = buffer.getvalue()
+
+    return variants
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESSING_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def generate_variants(source: bytes | str) -> dict[ImageVariant, bytes]:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_executor(), render_variants, source)
+    # only undecodable uploads are the client's fault; I/O errors stay 5xx
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise exceptions.InvalidImage()
@@ -0,0 +1,174 @@
+"""Bulk donation ingestion from payment provider settlement files"""
+
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, NamedTuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+
+from src.campaign import idempotency, leaderboard, service
+from src.campaign.constants import (
+    CSV_LIST_SEPARATOR,
+    INGEST_FORMAT_CONTENT_TYPES,
+    ErrorMessage,
+    IngestFormat,
+)
+from src.campaign.exceptions import UnsupportedIngestFormat
+from src.campaign.models import Campaign
+from src.campaign.schemas import BulkDonationRecord
+from src.config import settings
+from src.database import async_session
+
+_record_adapter = TypeAdapter(BulkDonationRecord)
+
+# csv cells holding lists
+_CSV_LIST_FIELDS = frozenset({"social_media_links"})
+
+
+class IngestResult(NamedTuple):
+    inserted: int
+    duplicates: int
+    errors: list[tuple[int, str]]
+
+
+def get_ingest_format(content_type: str | None) -> IngestFormat:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in INGEST_FORMAT_CONTENT_TYPES:
+        raise UnsupportedIngestFormat()
+    return INGEST_FORMAT_CONTENT_TYPES[media_type]
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering all of it"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode(errors="replace").rstrip("\r")
+    if pending:
+        yield pending.decode(errors="replace").rstrip("\r")
+
+
+def csv_record(header: list[str], line: str) -> dict[str, Any]:
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+    record: dict[str, Any] = {}
+    for field, value in zip(header, values):
+        if value == "":
+            record[field] = None
+        elif field in _CSV_LIST_FIELDS:
+            record[field] = value.split(CSV_LIST_SEPARATOR)
+        else:
+            record[field] = value
+    return record
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc'])) or 'record'}: {detail['msg']}"
+        for detail in error.errors(include_url=False)
+    )
+
+
+async def iter_records(
+    lines: AsyncIterable[str], ingest_format: IngestFormat
+) -> AsyncIterator[tuple[int, BulkDonationRecord | str]]:
+    """Yield the line number and the validated record, or the validation error"""
+    header: list[str] | None = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            if ingest_format == IngestFormat.NDJSON:
+                yield line_no, _record_adapter.validate_json(line)
+            elif header is None:
+                header = next(csv.reader([line]))
+            else:
+                yield (
+                    line_no,
+                    _record_adapter.validate_python(csv_record(header, line)),
+                )
+        except ValidationError as error:
+            yield line_no, format_validation_error(error)
+        except ValueError as error:
+            yield line_no, str(error)
+
+
+async def insert_batch(
+    batch: list[tuple[int, BulkDonationRecord]],
+) -> IngestResult:
+    errors: list[tuple[int, str]] = []
+    try:
+        async with async_session.begin() as db:
+            campaign_ids = set(
+                await db.scalars(
+                    select(Campaign.id).where(
+                        Campaign.id.in_({record.campaign_id for _, record in batch})
+                    )
+                )
+            )
+            donations: list[BulkDonationRecord] = []
+            for line_no, record in batch:
+                if record.campaign_id in campaign_ids:
+                    donations.append(record)
+                else:
+                    errors.append((line_no, ErrorMessage.CAMPAIGN_NOT_FOUND))
+            inserted_references = (
+                await service.create_donations(db, donations) if donations else {}
+            )
+    except DBAPIError as error:
+        # the batch is one transaction, none of its records were written
+        detail = f"Batch rejected by the database: {error.orig}"
+        return IngestResult(0, 0, [(line_no, detail) for line_no, _ in batch])
+
+    # the batch committed, so its donations can be scored and marked
+    references = [
+        reference
+        for campaign_references in inserted_references.values()
+        for reference in campaign_references
+    ]
+    for campaign_id, campaign_references in inserted_references.items():
+        await leaderboard.record_donation(campaign_id, len(campaign_references))
+    await idempotency.mark_donations_recorded(references)
+    return IngestResult(
+        len(references),
+        len(donations) - len(references),
+        errors,
+    )
+
+
+async def ingest_donations(
+    lines: AsyncIterable[str],
+    ingest_format: IngestFormat,
+    batch_size: int = settings.DONATION_INGEST_BATCH_SIZE,
+) -> IngestResult:
+    inserted = duplicates = 0
+    errors: list[tuple[int, str]] = []
+    batch: list[tuple[int, BulkDonationRecord]] = []
+
+    async def flush() -> None:
+        nonlocal inserted, duplicates
+        batch_result = await insert_batch(batch)
+        inserted += batch_result.inserted
+        duplicates += batch_result.duplicates
+        errors.extend(batch_result.errors)
+        batch.clear()
+
+    async for line_no, record in iter_records(lines, ingest_format):
+        if isinstance(record, str):
+            errors.append((line_no, record))
+            continue
+        batch.append((line_no, record))
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    errors.sort()
+    return IngestResult(inserted, duplicates, errors)
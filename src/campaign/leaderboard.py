@@ -0,0 +1,242 @@
+"""
+Redis sorted set of campaigns ranked by popularity, with their cached cards.
+Callers fall back to postgres when it is unavailable.
+"""
+
+import logging
+from collections.abc import Iterable
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.campaign import counters
+from src.campaign.models import Campaign, CampaignCard
+from src.config import settings
+from src.database import async_session
+from src.redis import (
+    delete_by_key,
+    get_redis_client,
+    is_redis_configured,
+    mget,
+    mset_many,
+    pipeline,
+    release_lock,
+)
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "campaign:leaderboard"
+CARD_KEY = "campaign:card:{}"
+REBUILD_LOCK_KEY = "campaign:leaderboard:rebuild:lock"
+REBUILD_CHUNK_SIZE = 1000
+# seconds a worker holds the rebuild lock, and a crashed rebuild's scratch set
+# outlives it
+REBUILD_TIMEOUT = 300
+
+# reactions and supporters are packed into one exact float score, with
+# reactions taking precedence; exact while supporters < 2**24
+REACTION_SCORE_WEIGHT = 2**24
+
+# only add to an existing leaderboard, a partial one must never be served
+_ADD_IF_BUILT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('ZADD', KEYS[1], 'NX', ARGV[1], ARGV[2])
+end
+return 0
+"""
+
+_card_adapter = TypeAdapter(CampaignCard)
+
+
+def popularity_score(no_of_reactions: int, no_of_supporters: int) -> int:
+    return no_of_reactions * REACTION_SCORE_WEIGHT + no_of_supporters
+
+
+def card_key(campaign_id: UUID) -> str:
+    return CARD_KEY.format(campaign_id)
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """
+    Rebuild the leaderboard from postgres into a scratch key of its own and
+    swap it in, so readers never see a half built set. Returns the number of
+    campaigns.
+
+    Reactions, donations and campaigns recorded between the postgres read and
+    the swap land in the replaced set and are missing from the new one until
+    the next rebuild; scores only order the hot list, postgres keeps the
+    counts.
+    """
+    client = get_redis_client()
+    scratch_key = f"{LEADERBOARD_KEY}:rebuild:{uuid4().hex}"
+
+    count = 0
+    pending = counters.pending_subquery()
+    result = await db.stream(
+        select(
+            Campaign.id,
+            Campaign.no_of_reactions + func.coalesce(pending.c.no_of_reactions, 0),
+            Campaign.no_of_supporters + func.coalesce(pending.c.no_of_supporters, 0),
+        ).outerjoin(pending, pending.c.campaign_id == Campaign.id)
+    )
+    async for rows in result.partitions(REBUILD_CHUNK_SIZE):
+        async with pipeline() as pipe:
+            pipe.zadd(
+                scratch_key,
+                {
+                    str(campaign_id): popularity_score(
+                        no_of_reactions, no_of_supporters
+                    )
+                    for campaign_id, no_of_reactions, no_of_supporters in rows
+                },
+            )
+            pipe.expire(scratch_key, REBUILD_TIMEOUT)
+        count += len(rows)
+
+    if count:
+        # RENAME keeps the scratch key's TTL
+        async with pipeline(transaction=True) as pipe:
+            pipe.rename(scratch_key, LEADERBOARD_KEY)
+            pipe.persist(LEADERBOARD_KEY)
+    else:
+        await client.delete(LEADERBOARD_KEY)
+    return count
+
+
+async def build_if_missing() -> None:
+    """
+    Build the leaderboard on first start, or after redis lost it. One worker
+    builds it; the others serve from postgres meanwhile.
+    """
+    if not is_redis_configured():
+        return
+    client = get_redis_client()
+    token = uuid4().hex
+    try:
+        if await client.exists(LEADERBOARD_KEY):
+            return
+        if not await client.set(REBUILD_LOCK_KEY, token, nx=True, ex=REBUILD_TIMEOUT):
+            return
+        try:
+            async with async_session() as db:
+                await rebuild(db)
+        finally:
+            await release_lock(REBUILD_LOCK_KEY, token)
+    except RedisError as error:
+        logger.warning("campaign leaderboard not built: %r", error)
+
+
+async def get_campaign_ids(
+    limit: int, after: tuple[int, int, UUID] | None = None
+) -> list[UUID] | None:
+    """
+    Ids of the next `limit` campaigns after the cursor `after`, or None when
+    the page can not be served from redis.
+    """
+    if not is_redis_configured():
+        return None
+    try:
+        client = get_redis_client()
+        start = 0
+        if after:
+            no_of_reactions, no_of_supporters, campaign_id = after
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.zrevrank(LEADERBOARD_KEY, str(campaign_id))
+                pipe.zscore(LEADERBOARD_KEY, str(campaign_id))
+                rank, score = await pipe.execute()
+            # the cursor campaign moved since the previous page was served
+            if rank is None or score != popularity_score(
+                no_of_reactions, no_of_supporters
+            ):
+                return None
+            start = rank + 1
+
+        members = await client.zrevrange(LEADERBOARD_KEY, start, start + limit - 1)
+        if not members and not await client.exists(LEADERBOARD_KEY):
+            return None
+    except RedisError as error:
+        logger.warning("campaign leaderboard unavailable: %r", error)
+        return None
+
+    return [UUID(member.decode()) for member in members]
+
+
+async def get_cached_cards(campaign_ids: list[UUID]) -> dict[UUID, CampaignCard]:
+    if not campaign_ids:
+        return {}
+    try:
+        cached_cards = await mget(
+            _card_adapter, [card_key(campaign_id) for campaign_id in campaign_ids]
+        )
+    except RedisError as error:
+        logger.warning("campaign card cache unavailable: %r", error)
+        return {}
+
+    return {
+        campaign_id: cached_card
+        for campaign_id, cached_card in zip(campaign_ids, cached_cards)
+        if cached_card is not None
+    }
+
+
+async def cache_cards(cards: Iterable[CampaignCard]) -> None:
+    try:
+        await mset_many(
+            _card_adapter,
+            {card_key(card.id): card for card in cards},
+            ttl=settings.CAMPAIGN_CARD_CACHE_TTL,
+        )
+    except RedisError as error:
+        logger.warning("failed to cache campaign cards: %r", error)
+
+
+async def _increment(campaign_id: UUID, amount: int) -> None:
+    if not is_redis_configured():
+        return
+    try:
+        async with pipeline() as pipe:
+            # XX: never recreate a campaign (or the whole set) redis lost
+            pipe.zadd(LEADERBOARD_KEY, {str(campaign_id): amount}, xx=True, incr=True)
+            pipe.delete(card_key(campaign_id))
+    except RedisError as error:
+        logger.warning("failed to update campaign leaderboard: %r", error)
+
+
+async def record_reaction(campaign_id: UUID) -> None:
+    await _increment(campaign_id, REACTION_SCORE_WEIGHT)
+
+
+async def record_donation(campaign_id: UUID, no_of_donations: int = 1) -> None:
+    await _increment(campaign_id, no_of_donations)
+
+
+async def add_campaign(campaign_id: UUID) -> None:
+    if not is_redis_configured():
+        return
+    try:
+        await get_redis_client().eval(
+            _ADD_IF_BUILT_SCRIPT, 1, LEADERBOARD_KEY, 0, str(campaign_id)
+        )
+    except RedisError as error:
+        logger.warning("failed to update campaign leaderboard: %r", error)
+
+
+async def remove_campaign(campaign_id: UUID) -> None:
+    if not is_redis_configured():
+        return
+    try:
+        async with pipeline() as pipe:
+            pipe.zrem(LEADERBOARD_KEY, str(campaign_id))
+            pipe.delete(card_key(campaign_id))
+    except RedisError as error:
+        logger.warning("failed to update campaign leaderboard: %r", error)
+
+
+async def invalidate_card(campaign_id: UUID) -> None:
+    try:
+        await delete_by_key(card_key(campaign_id))
+    except RedisError as error:
+        logger.warning("failed to invalidate campaign card: %r", error)
@@ -1,10 +1,11 @@
 from datetime import datetime
+from typing import NamedTuple
 from uuid import UUID
 
-from sqlalchemy import BigInteger, ForeignKey
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import BigInteger, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import LargeBinary, String
+from sqlalchemy.types import String
 
 from src.campaign.constants import CampaignProgress
 from src.constants import SA_RELATIONS_CASCADE_OPTIONS
@@ -17,7 +18,9 @@ class Campaign(CommonFieldsMixin, TimestampMixin, Base):
         ForeignKey("users.id", ondelete="SET NULL")
     )
     title: Mapped[str]
-    header_img: Mapped[bytes]
+    header_img_digest: Mapped[str] = mapped_column(String(64))
+    header_img_size: Mapped[int]
+    header_img_content_type: Mapped[str]
     description: Mapped[str]
     story: Mapped[str]
     goal: Mapped[int] = mapped_column(BigInteger)
@@ -53,10 +56,88 @@ class Campaign(CommonFieldsMixin, TimestampMixin, Base):
     progress: Mapped[str] = mapped_column(
         default=CampaignProgress.IN_PROGRESS.value, init=False
     )
+    # image variant name -> digest of the re-encoded variant in the blob store
+    header_img_variants: Mapped[dict[str, str]] = mapped_column(
+        JSONB, default_factory=dict, server_default="{}", init=False
+    )
+
+
+# backs keyset pagination of the hot campaigns list
+Index(
+    "campaign_popularity_idx",
+    Campaign.no_of_reactions.desc(),
+    Campaign.no_of_supporters.desc(),
+    Campaign.id.desc(),
+)
+
+
+class CampaignCard(NamedTuple):
+    """Projection of the campaign columns shown on campaign list cards"""
+
+    id: UUID
+    title: str
+    description: str
+    header_img_digest: str
+    header_img_content_type: str
+    header_img_variants: dict[str, str]
+    goal: int
+    amt_reached: int
+    category: list[str]
+    no_of_reactions: int
+    no_of_supporters: int
+    deadline: datetime | None
+
+
+# large columns (story, social media links, ...) are never selected for cards
+CAMPAIGN_CARD_COLUMNS = tuple(
+    getattr(Campaign, field) for field in CampaignCard._fields
+)
+
+
+class CampaignRef(NamedTuple):
+    """The campaign columns write endpoints check before writing"""
+
+    id: UUID
+    creator_id: UUID | None
+    progress: str
+    deadline: datetime | None
+
+
+CAMPAIGN_REF_COLUMNS = tuple(getattr(Campaign, field) for field in CampaignRef._fields)
+
+
+class CampaignCounterShard(Base):
+    """
+    Counter increments of a campaign not yet folded into its row. Writers add
+    to a random slot so concurrent donations / reactions don't all queue on
+    the campaign row lock.
+    """
+
+    __tablename__ = "campaign_counter_shard"
+    campaign_id: Mapped[UUID] = mapped_column(
+        ForeignKey("campaign.id", ondelete="CASCADE"), primary_key=True
+    )
+    slot: Mapped[int] = mapped_column(primary_key=True)
+    no_of_reactions: Mapped[int] = mapped_column(default=0, server_default="0")
+    no_of_supporters: Mapped[int] = mapped_column(default=0, server_default="0")
+    amt_reached: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
 
 
 class Donation(CommonFieldsMixin, TimestampMixin, Base):
     __tablename__ = "donation"
+    __table_args__ = (
+        UniqueConstraint("payaza_reference", name="donation_payaza_reference_key"),
+        UniqueConstraint(
+            "transaction_reference", name="donation_transaction_reference_key"
+        ),
+        # backs keyset pagination of a campaign's donations
+        Index(
+            "donation_campaign_id_created_at_id_idx",
+            "campaign_id",
+            "created_at",
+            "id",
+        ),
+    )
     anonymous: Mapped[bool] = mapped_column()
     payaza_reference: Mapped[str]
     transaction_reference: Mapped[str]
@@ -82,15 +163,21 @@ class Donation(CommonFieldsMixin, TimestampMixin, Base):
 class FeedPost(CommonFieldsMixin, TimestampMixin, Base):
     __tablename__ = "feedpost"
     text: Mapped[str]
-    media: Mapped[list[bytes] | None] = mapped_column(
-        ARRAY(LargeBinary, zero_indexes=True)
+    # metadata only - the media bytes live in the blob store
+    media: Mapped[list["FeedPostMedium"]] = relationship(
+        back_populates="feed_post",
+        init=False,
+        lazy="selectin",
+        order_by="FeedPostMedium.ordinal",
+        passive_deletes=True,
+        cascade=SA_RELATIONS_CASCADE_OPTIONS,
     )
     creator_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     campaign_id: Mapped[UUID] = mapped_column(
-        ForeignKey("campaign.id", ondelete="CASCADE"), init=False
+        ForeignKey("campaign.id", ondelete="CASCADE")
     )
     campaign: Mapped[Campaign] = relationship(
-        back_populates="feed_posts", foreign_keys=campaign_id
+        back_populates="feed_posts", foreign_keys=campaign_id, init=False
     )
     user_reactions: Mapped[list["UserFeedPostReaction"]] = relationship(
         back_populates="feed_post",
@@ -101,8 +188,32 @@ class FeedPost(CommonFieldsMixin, TimestampMixin, Base):
     no_of_reactions: Mapped[int] = mapped_column(default=0)
 
 
+class FeedPostMedium(CommonFieldsMixin, TimestampMixin, Base):
+    __tablename__ = "feed_post_media"
+    __table_args__ = (
+        Index("feed_post_media_feed_post_id_ordinal_idx", "feed_post_id", "ordinal"),
+    )
+    feed_post_id: Mapped[UUID] = mapped_column(
+        ForeignKey("feedpost.id", ondelete="CASCADE"), init=False
+    )
+    feed_post: Mapped[FeedPost] = relationship(
+        back_populates="media", foreign_keys=feed_post_id, init=False
+    )
+    ordinal: Mapped[int]
+    digest: Mapped[str] = mapped_column(String(64))
+    size: Mapped[int]
+    content_type: Mapped[str]
+
+
 class UserCampaignReaction(CommonFieldsMixin, TimestampMixin, Base):
     __tablename__ = "user_campaign_reaction"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "campaign_id",
+            name="user_campaign_reaction_user_id_campaign_id_key",
+        ),
+    )
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     campaign_id: Mapped[UUID] = mapped_column(
         ForeignKey("campaign.id", ondelete="CASCADE")
@@ -114,6 +225,13 @@ class UserCampaignReaction(CommonFieldsMixin, TimestampMixin, Base):
 
 class UserFeedPostReaction(CommonFieldsMixin, TimestampMixin, Base):
     __tablename__ = "user_feed_post_reaction"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "feed_post_id",
+            name="user_feed_post_reaction_user_id_feed_post_id_key",
+        ),
+    )
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     feed_post_id: Mapped[UUID] = mapped_column(
         ForeignKey("feedpost.id", ondelete="CASCADE")
@@ -1,104 +1,202 @@
 from base64 import b64encode
+from collections.abc import AsyncIterator
+from datetime import datetime
 from io import BytesIO
 from typing import Annotated
 from uuid import UUID
 
 import segno
-from fastapi import APIRouter, Depends, Form, Query, Response, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Form,
+    Header,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pydantic.types import UUID4, NaiveDatetime
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from src.campaign import dependencies, schemas, service
-from src.campaign.constants import CampaignProgress
-from src.campaign.models import Campaign, FeedPost
-from src.database import session
+from src.campaign import (
+    dependencies,
+    detail_cache,
+    exceptions,
+    export,
+    idempotency,
+    ingest,
+    leaderboard,
+    schemas,
+    service,
+)
+from src.campaign.constants import (
+    DEFAULT_IMAGE_CONTENT_TYPE,
+    EXPORT_FORMAT_MEDIA_TYPES,
+    MEDIA_VERSION_LENGTH,
+    NDJSON_MEDIA_TYPE,
+    CampaignProgress,
+    ExportFormat,
+    ImageVariant,
+)
+from src.campaign.models import Campaign, CampaignCard, CampaignRef, Donation, FeedPost
+from src.campaign.utils import (
+    cache_headers,
+    etag_matches,
+    media_url,
+    not_modified_response,
+)
+from src.config import settings
+from src.database import async_session, session
+from src.exceptions import InvalidCursor
+from src.pagination import decode_cursor, encode_cursor
+from src.ratelimit import RateLimiter
+from src.storage import blob_store
+from src.uploads import store_upload
 from src.user import exceptions as user_exceptions
 from src.user import service as user_service
-from src.user.dependencies import validate_user_access_token
-from src.user.models import User
+from src.user.dependencies import limit_by_user, validate_user_access_token
+from src.user.models import UserIdentity
 
 campaign_router = APIRouter()
 
+# per user
+reaction_limiter = RateLimiter("reaction", limit=60, window=60)
+qr_code_limiter = RateLimiter("qr_code", limit=10, window=60)
+
+
+def campaign_image_url(
+    request: Request, campaign: Campaign | CampaignCard, variant: ImageVariant
+) -> str:
+    digest, _ = service.get_header_img_digest(campaign, variant)
+    return media_url(
+        request,
+        "retrieve_campaign_image",
+        {"variant": variant.value, "v": digest[:MEDIA_VERSION_LENGTH]},
+        campaign_id=campaign.id,
+    )
+
+
+async def inline_campaign_image(
+    campaign: Campaign | CampaignCard,
+) -> str | None:
+    if not settings.LEGACY_INLINE_MEDIA:
+        return None
+    # older clients expect the original upload
+    return b64encode(await service.get_campaign_header_img(campaign)).decode()
+
+
+def percent_reached(amt_reached: int, goal: int) -> float:
+    # over-funded campaigns show as fully funded
+    return min(amt_reached / goal * 100, 100.0) if goal else 0.0
+
+
+async def campaign_card_response(
+    request: Request, campaign: CampaignCard
+) -> schemas.CampaignResponse:
+    return schemas.CampaignResponse(
+        id=campaign.id,
+        title=campaign.title,
+        description=campaign.description,
+        image_url=campaign_image_url(request, campaign, ImageVariant.CARD),
+        image=await inline_campaign_image(campaign),
+        goal=campaign.goal,
+        amt_reached=campaign.amt_reached,
+        percent_reached=percent_reached(campaign.amt_reached, campaign.goal),
+        category=campaign.category,
+        no_of_reactions=campaign.no_of_reactions,
+        no_of_donors=campaign.no_of_supporters,
+        deadline=campaign.deadline,
+    )
+
+
+async def feed_post_response(
+    request: Request, feed_post: FeedPost
+) -> schemas.FeedResponse:
+    return schemas.FeedResponse(
+        id=feed_post.id,
+        text=feed_post.text,
+        media_urls=[
+            media_url(
+                request,
+                "retrieve_feed_post_medium",
+                {"v": feed_post_medium.digest[:MEDIA_VERSION_LENGTH]},
+                feed_post_id=feed_post.id,
+                index=feed_post_medium.ordinal,
+            )
+            for feed_post_medium in feed_post.media
+        ],
+        media=[
+            b64encode(await blob_store.get(feed_post_medium.digest)).decode()
+            for feed_post_medium in feed_post.media
+        ]
+        if settings.LEGACY_INLINE_MEDIA and feed_post.media
+        else None,
+        no_of_reactions=feed_post.no_of_reactions,
+    )
+
 
 @campaign_router.get(
     "/hot",
-    response_model=list[schemas.CampaignResponse],
+    response_model=schemas.CampaignPageResponse,
     status_code=status.HTTP_200_OK,
 )
 async def retrieve_popular_campaigns(
+    request: Request,
     db: Annotated[AsyncSession, Depends(session)],
-    limit: Annotated[int, Query(ge=0, le=10)] = 5,
-    skip: Annotated[int, Query(ge=0)] = 0,
-) -> list[schemas.CampaignResponse]:
-    campaigns = await service.retrieve_campaigns_with_highest_reactions_and_donors(
-        db, limit, skip
+    limit: Annotated[int, Query(ge=1, le=10)] = 5,
+    cursor: Annotated[
+        str | None, Query(description="`next_cursor` of the previous page")
+    ] = None,
+) -> schemas.CampaignPageResponse:
+    after = None
+    if cursor:
+        no_of_reactions, no_of_supporters, campaign_id = decode_cursor(cursor, 3)
+        try:
+            after = (int(no_of_reactions), int(no_of_supporters), UUID(campaign_id))
+        except (TypeError, ValueError):
+            raise InvalidCursor()
+
+    # one extra row tells whether there is a next page
+    campaigns = await service.retrieve_popular_campaigns(db, limit + 1, after)
+    next_cursor = (
+        encode_cursor(service.popularity_sort_key(campaigns[limit - 1]))
+        if len(campaigns) > limit
+        else None
+    )
+    return schemas.CampaignPageResponse(
+        items=[
+            await campaign_card_response(request, campaign)
+            for campaign in campaigns[:limit]
+        ],
+        next_cursor=next_cursor,
     )
-    campaigns_response_schemas = []
-    for campaign in campaigns:
-        amt_reached_in_percent = (
-            (campaign.amt_reached / campaign.goal) * 100 if campaign.goal else 0.0
-        )
-        campaign_response = schemas.CampaignResponse(
-            id=campaign.id,
-            title=campaign.title,
-            description=campaign.description,
-            image=b64encode(campaign.header_img).decode(),
-            goal=campaign.goal,
-            amt_reached=campaign.amt_reached,
-            percent_reached=amt_reached_in_percent,
-            category=campaign.category,
-            no_of_reactions=campaign.no_of_reactions,
-            no_of_donors=campaign.no_of_supporters,
-            deadline=campaign.deadline,
-        )
-        campaigns_response_schemas.append(campaign_response)
-
-    return campaigns_response_schemas
 
 
-@campaign_router.get(
-    "/{campaign_id}",
-    response_model=schemas.RetrieveCampaignResponse,
-    status_code=status.HTTP_200_OK,
-    dependencies=[Depends(validate_user_access_token)],
-    summary="Retrieve campaign information in detail",
-)
-async def retrieve_campaign(
-    db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
+async def campaign_detail_response(
+    request: Request, campaign_detail: service.CampaignDetail
 ) -> schemas.RetrieveCampaignResponse:
-    amt_reached_in_percent = (
-        (campaign.amt_reached / campaign.goal) * 100 if campaign.goal else 0.0
-    )
-    campaign_feed_posts: list[schemas.FeedResponse] = []
-    for feed_post in await campaign.awaitable_attrs.feed_posts:
-        campaign_feed_posts.append(
-            schemas.FeedResponse(
-                id=feed_post.id,
-                text=feed_post.text,
-                media=[
-                    b64encode(feed_post_medium_bytes).decode()
-                    for feed_post_medium_bytes in feed_post.media
-                ]
-                if feed_post.media
-                else None,
-                no_of_reactions=feed_post.no_of_reactions,
-            )
-        )
-    beneficiary_user = None
-    if campaign.beneficiary_user_id:
-        beneficiary_user = await db.get_one(User, campaign.beneficiary_user_id)
+    campaign, beneficiary_user, counters = campaign_detail
+    campaign_feed_posts: list[schemas.FeedResponse] = [
+        await feed_post_response(request, feed_post)
+        for feed_post in campaign.feed_posts
+    ]
     return schemas.RetrieveCampaignResponse(
         id=campaign.id,
         title=campaign.title,
         description=campaign.description,
-        image=b64encode(campaign.header_img).decode(),
+        image_url=campaign_image_url(request, campaign, ImageVariant.FULL),
+        image=await inline_campaign_image(campaign),
         goal=campaign.goal,
-        amt_reached=campaign.amt_reached,
-        percent_reached=amt_reached_in_percent,
+        amt_reached=counters.amt_reached,
+        percent_reached=percent_reached(counters.amt_reached, campaign.goal),
         category=campaign.category,
-        no_of_reactions=campaign.no_of_reactions,
-        no_of_donors=campaign.no_of_supporters,
+        no_of_reactions=counters.no_of_reactions,
+        no_of_donors=counters.no_of_supporters,
         deadline=campaign.deadline,
         story=campaign.story,
         social_media_links=campaign.social_media_links,
@@ -113,6 +211,59 @@ async def retrieve_campaign(
     )
 
 
+@campaign_router.get(
+    "/{campaign_id}",
+    response_model=schemas.RetrieveCampaignResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(validate_user_access_token)],
+    summary="Retrieve campaign information in detail",
+)
+async def retrieve_campaign(request: Request, campaign_id: UUID4) -> Response:
+    async def build_body() -> bytes | None:
+        # shared with concurrent requests, so never on this request's session
+        async with async_session() as db:
+            campaign_detail = await service.get_campaign_detail(db, campaign_id)
+            if campaign_detail is None:
+                return None
+            response = await campaign_detail_response(request, campaign_detail)
+        return response.model_dump_json().encode()
+
+    body = await detail_cache.get_body(campaign_id, build_body)
+    if body is None:
+        raise exceptions.CampaignNotFound()
+    return Response(content=body, media_type="application/json")
+
+
+@campaign_router.get(
+    "/{campaign_id}/image",
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+    summary="Retrieve a campaign's header image",
+    responses={
+        status.HTTP_200_OK: {"content": {"image/*": {}}},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Image not modified"},
+    },
+)
+async def retrieve_campaign_image(
+    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
+    variant: ImageVariant | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    version: Annotated[str | None, Query(alias="v")] = None,
+) -> Response:
+    digest, content_type = service.get_header_img_digest(campaign, variant)
+    headers = cache_headers(
+        f'"{digest}"', immutable=version == digest[:MEDIA_VERSION_LENGTH]
+    )
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified_response(headers)
+
+    return Response(
+        content=await service.get_campaign_header_img(campaign, variant),
+        media_type=content_type,
+        headers=headers,
+    )
+
+
 @campaign_router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -121,7 +272,8 @@ async def retrieve_campaign(
 )
 async def create_campaign(
     db: Annotated[AsyncSession, Depends(session)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
+    background_tasks: BackgroundTasks,
     title: Annotated[str, Form()],
     description: Annotated[str, Form()],
     story: Annotated[str, Form()],
@@ -131,11 +283,10 @@ async def create_campaign(
     social_media_links: Annotated[list[str], Form()],
     header_img: UploadFile,
 ) -> UUID:
-    await header_img.seek(0)
     campaign = await service.create_campaign(
         db,
         title,
-        await header_img.read(),
+        await store_upload(header_img, DEFAULT_IMAGE_CONTENT_TYPE),
         description,
         story,
         goal,
@@ -144,7 +295,8 @@ async def create_campaign(
         social_media_links,
         user.id,
     )
-    await header_img.close()
+    background_tasks.add_task(leaderboard.add_campaign, campaign.id)
+    background_tasks.add_task(service.invalidate_user_campaigns, user.id)
     return campaign.id
 
 
@@ -155,31 +307,14 @@ async def create_campaign(
     response_model=list[schemas.CampaignResponse],
 )
 async def retrieve_my_campaigns(
+    request: Request,
     db: Annotated[AsyncSession, Depends(session)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
 ) -> list[schemas.CampaignResponse]:
     user_campaigns = await service.retrieve_user_campaigns(db, user.id)
-    campaigns_response = []
-    for campaign in user_campaigns:
-        amt_reached_in_percent = (
-            (campaign.amt_reached / campaign.goal) * 100 if campaign.goal else 0.0
-        )
-        campaigns_response.append(
-            schemas.CampaignResponse(
-                id=campaign.id,
-                title=campaign.title,
-                description=campaign.description,
-                image=b64encode(campaign.header_img).decode(),
-                goal=campaign.goal,
-                amt_reached=campaign.amt_reached,
-                percent_reached=amt_reached_in_percent,
-                category=campaign.category,
-                no_of_reactions=campaign.no_of_reactions,
-                no_of_donors=campaign.no_of_supporters,
-                deadline=campaign.deadline,
-            )
-        )
-    return campaigns_response
+    return [
+        await campaign_card_response(request, campaign) for campaign in user_campaigns
+    ]
 
 
 @campaign_router.patch(
@@ -192,6 +327,7 @@ async def retrieve_my_campaigns(
 async def update_campaign(
     db: Annotated[AsyncSession, Depends(session)],
     campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
+    background_tasks: BackgroundTasks,
     title: Annotated[str | None, Form()] = None,
     description: Annotated[str | None, Form()] = None,
     story: Annotated[str | None, Form()] = None,
@@ -206,7 +342,9 @@ async def update_campaign(
         db,
         campaign,
         title,
-        await header_img.read() if header_img else None,
+        await store_upload(header_img, DEFAULT_IMAGE_CONTENT_TYPE)
+        if header_img
+        else None,
         description,
         story,
         goal,
@@ -215,6 +353,9 @@ async def update_campaign(
         social_media_links,
         progress,
     )
+    background_tasks.add_task(
+        service.invalidate_campaign, campaign.id, campaign.creator_id
+    )
     return
 
 
@@ -227,32 +368,43 @@ async def update_campaign(
 )
 async def delete_campaign(
     db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
+    background_tasks: BackgroundTasks,
 ) -> None:
     await service.delete_campaign(db, campaign)
+    background_tasks.add_task(leaderboard.remove_campaign, campaign.id)
+    background_tasks.add_task(
+        service.invalidate_campaign, campaign.id, campaign.creator_id
+    )
     return
 
 
 @campaign_router.post(
     "/{campaign_id}/like",
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(dependencies.validate_user_not_already_reacted_to_campaign)],
     response_model=None,
+    dependencies=[Depends(limit_by_user(reaction_limiter))],
     summary="React to a campaign",
 )
 async def react_to_campaign(
     db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
+    background_tasks: BackgroundTasks,
 ) -> None:
     await service.user_reaction_to_campaign(db, campaign, user)
+    # scored once the reaction committed, so a rollback never inflates it
+    background_tasks.add_task(leaderboard.record_reaction, campaign.id)
     return
 
 
 @campaign_router.get(
     "/{campaign_id}/qr-code",
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(dependencies.validate_user_created_campaign)],
+    dependencies=[
+        Depends(dependencies.validate_user_created_campaign),
+        Depends(limit_by_user(qr_code_limiter)),
+    ],
     summary="Generate qr-code for a campaign",
     responses={status.HTTP_201_CREATED: {"content": {"image/png": {}}}},
 )
@@ -278,30 +430,67 @@ async def add_beneficiary(
     db: Annotated[AsyncSession, Depends(session)],
     campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
     email: str,
+    background_tasks: BackgroundTasks,
 ) -> None:
     beneficiary = await user_service.check_user_exists_by_email(db, email)
     if not beneficiary:
         raise user_exceptions.UserNotFound()
     await service.add_beneficiary_to_campaign(db, campaign, user_id=beneficiary.id)
+    background_tasks.add_task(detail_cache.invalidate, campaign.id)
     return None
 
 
 @campaign_router.post(
     "/feed-post/{feed_id}/like",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(dependencies.validate_user_not_already_reacted_to_feed_post)],
     response_model=None,
+    dependencies=[Depends(limit_by_user(reaction_limiter))],
     summary="React to a campaign's feed post",
 )
 async def react_to_feed_post(
     db: Annotated[AsyncSession, Depends(session)],
     feed_post: Annotated[FeedPost, Depends(dependencies.validate_feed_post_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
 ) -> None:
     await service.user_reaction_to_feed_post(db, feed_post, user)
     return
 
 
+@campaign_router.get(
+    "/feed-post/{feed_post_id}/media/{index}",
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+    summary="Retrieve a medium attached to a campaign's feed post",
+    responses={
+        status.HTTP_200_OK: {"content": {"image/*": {}}},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Medium not modified"},
+    },
+)
+async def retrieve_feed_post_medium(
+    db: Annotated[AsyncSession, Depends(session)],
+    feed_post_id: UUID,
+    index: Annotated[int, Path(ge=0)],
+    if_none_match: Annotated[str | None, Header()] = None,
+    version: Annotated[str | None, Query(alias="v")] = None,
+) -> Response:
+    feed_post_medium = await service.get_feed_post_medium(db, feed_post_id, index)
+    if not feed_post_medium:
+        raise exceptions.FeedPostMediumNotFound()
+
+    digest = feed_post_medium.digest
+    headers = cache_headers(
+        f'"{digest}"', immutable=version == digest[:MEDIA_VERSION_LENGTH]
+    )
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified_response(headers)
+
+    return Response(
+        content=await blob_store.get(digest),
+        media_type=feed_post_medium.content_type,
+        headers=headers,
+    )
+
+
 @campaign_router.post(
     "/{campaign_id}/feed-post",
     status_code=status.HTTP_201_CREATED,
@@ -310,9 +499,11 @@ async def react_to_feed_post(
     summary="Create a campaign feed post",
 )
 async def create_feed_post(
+    request: Request,
     db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
-    user: Annotated[User, Depends(validate_user_access_token)],
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
+    user: Annotated[UserIdentity, Depends(validate_user_access_token)],
+    background_tasks: BackgroundTasks,
     text: Annotated[str, Form()],
     media: list[UploadFile] | None = None,
 ) -> schemas.FeedResponse:
@@ -320,21 +511,14 @@ async def create_feed_post(
     feed_post = await service.create_feed_post(
         db,
         text,
-        [await media.read() for media in media] if media else None,
+        [await store_upload(medium, DEFAULT_IMAGE_CONTENT_TYPE) for medium in media]
+        if media
+        else None,
         user.id,
         campaign,
     )
-    return schemas.FeedResponse(
-        id=feed_post.id,
-        text=feed_post.text,
-        media=[
-            b64encode(feed_post_medium_bytes).decode()
-            for feed_post_medium_bytes in feed_post.media
-        ]
-        if feed_post.media
-        else None,
-        no_of_reactions=feed_post.no_of_reactions,
-    )
+    background_tasks.add_task(detail_cache.invalidate, campaign.id)
+    return await feed_post_response(request, feed_post)
 
 
 @campaign_router.patch(
@@ -347,8 +531,10 @@ async def create_feed_post(
     ],
 )
 async def update_feed_post(
+    request: Request,
     db: Annotated[AsyncSession, Depends(session)],
     feed_post: Annotated[FeedPost, Depends(dependencies.validate_feed_post_exist)],
+    background_tasks: BackgroundTasks,
     text: Annotated[str | None, Form()] = None,
     media: list[UploadFile] | None = None,
 ):
@@ -356,19 +542,12 @@ async def update_feed_post(
         db,
         feed_post,
         text,
-        [await media.read() for media in media] if media else None,
-    )
-    return schemas.FeedResponse(
-        id=feed_post.id,
-        text=feed_post.text,
-        media=[
-            b64encode(feed_post_medium_bytes).decode()
-            for feed_post_medium_bytes in feed_post.media
-        ]
-        if feed_post.media
+        [await store_upload(medium, DEFAULT_IMAGE_CONTENT_TYPE) for medium in media]
+        if media
         else None,
-        no_of_reactions=feed_post.no_of_reactions,
     )
+    background_tasks.add_task(detail_cache.invalidate, feed_post.campaign_id)
+    return await feed_post_response(request, feed_post)
 
 
 @campaign_router.delete(
@@ -384,8 +563,10 @@ async def update_feed_post(
 async def delete_feed_post(
     db: Annotated[AsyncSession, Depends(session)],
     feed_post: Annotated[FeedPost, Depends(dependencies.validate_feed_post_exist)],
+    background_tasks: BackgroundTasks,
 ) -> None:
     await service.delete_feed_post(db, feed_post)
+    background_tasks.add_task(detail_cache.invalidate, feed_post.campaign_id)
     return
 
 
@@ -393,15 +574,19 @@ async def delete_feed_post(
     "/{campaign_id}/donation",
     response_model=None,
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(dependencies.validate_campaign_exist)],
     summary="Save information on a donation",
 )
 async def save_donation(
     db: Annotated[AsyncSession, Depends(session)],
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
     data: schemas.SaveDonationRequest,
+    background_tasks: BackgroundTasks,
 ):
-    await service.create_donation(
+    # retries of a recorded donation end here, without a database write
+    if not await idempotency.claim_donation(data.payaza_reference):
+        return
+
+    recorded = await service.create_donation(
         db,
         data.payaza_reference,
         data.transaction_reference,
@@ -414,30 +599,138 @@ async def save_donation(
         data.recovery_acct_name,
         campaign,
     )
+    # background tasks run after the session committed
+    background_tasks.add_task(
+        idempotency.mark_donations_recorded, [data.payaza_reference]
+    )
+    if recorded:
+        background_tasks.add_task(leaderboard.record_donation, campaign.id)
     return
 
 
+@campaign_router.get(
+    "/{campaign_id}/donation/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    dependencies=[Depends(dependencies.validate_user_created_campaign)],
+    summary="Export the donations made to a campaign",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {
+                media_type: {} for media_type in EXPORT_FORMAT_MEDIA_TYPES.values()
+            }
+        }
+    },
+)
+async def export_campaign_donations(
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+) -> StreamingResponse:
+    # resolved before streaming, so a missing optional dependency is a 501
+    encoder = export.get_encoder(export_format)
+    filename = f"donations-{campaign.id}.{export_format.value}"
+    return StreamingResponse(
+        encoder(export.iter_donation_batches(campaign.id)),
+        media_type=EXPORT_FORMAT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@campaign_router.post(
+    "/donation/bulk",
+    response_model=schemas.DonationIngestResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(dependencies.validate_ingest_api_key)],
+    summary="Ingest a batch of donations from NDJSON or CSV",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {},
+                "text/csv": {},
+            },
+        }
+    },
+)
+async def ingest_donations(
+    request: Request,
+    content_type: Annotated[str | None, Header()] = None,
+) -> schemas.DonationIngestResponse:
+    ingest_format = ingest.get_ingest_format(content_type)
+    result = await ingest.ingest_donations(
+        ingest.iter_lines(request.stream()), ingest_format
+    )
+    return schemas.DonationIngestResponse(
+        inserted=result.inserted,
+        duplicates=result.duplicates,
+        errors=[
+            schemas.DonationIngestError(line=line, detail=detail)
+            for line, detail in result.errors
+        ],
+    )
+
+
+def donation_response(donation: Donation) -> schemas.DonationResponse:
+    # anonymous donors are never named
+    return schemas.DonationResponse(
+        id=donation.id,
+        anonymous=donation.anonymous,
+        name=None if donation.anonymous else donation.name,
+        social_media_link=None if donation.anonymous else donation.social_media_link,
+        amount=donation.amount,
+    )
+
+
+async def donation_lines(campaign_id: UUID) -> AsyncIterator[str]:
+    # the request's session is closed before a streamed body is sent
+    async with async_session.begin() as db:
+        async for donation in service.stream_campaign_donations(db, campaign_id):
+            yield donation_response(donation).model_dump_json() + "\n"
+
+
 @campaign_router.get(
     "/{campaign_id}/donation",
-    summary="Get all donations made to a campaign",
+    summary="Get the donations made to a campaign",
+    description=(
+        "Pages of donations, newest first. Send `Accept: application/x-ndjson` "
+        "to stream every donation instead, one JSON object per line."
+    ),
     status_code=status.HTTP_200_OK,
-    response_model=list[schemas.DonationResponse],
+    response_model=schemas.DonationPageResponse,
+    responses={status.HTTP_200_OK: {"content": {NDJSON_MEDIA_TYPE: {}}}},
 )
 async def get_campaign_donations(
-    campaign: Annotated[Campaign, Depends(dependencies.validate_campaign_exist)],
-) -> list[schemas.DonationResponse]:
-    donations = await campaign.awaitable_attrs.donations
-    donations_response: list[schemas.DonationResponse] = []
-    for donation in donations:
-        donations_response.append(
-            schemas.DonationResponse(
-                id=donation.id,
-                anonymous=donation.anonymous,
-                name=donation.name if donation.anonymous else None,
-                social_media_link=donation.social_media_links
-                if donation.anonymous
-                else None,
-                amount=donation.amount,
-            )
+    db: Annotated[AsyncSession, Depends(session)],
+    campaign: Annotated[CampaignRef, Depends(dependencies.validate_campaign_ref_exist)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Annotated[
+        str | None, Query(description="`next_cursor` of the previous page")
+    ] = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> schemas.DonationPageResponse | StreamingResponse:
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            donation_lines(campaign.id), media_type=NDJSON_MEDIA_TYPE
         )
-    return donations_response
+
+    after = None
+    if cursor:
+        created_at, donation_id = decode_cursor(cursor, 2)
+        try:
+            after = (datetime.fromisoformat(created_at), UUID(donation_id))
+        except (TypeError, ValueError):
+            raise InvalidCursor()
+
+    # one extra row tells whether there is a next page
+    donations = await service.retrieve_campaign_donations(
+        db, campaign.id, limit + 1, after
+    )
+    next_cursor = (
+        encode_cursor((donations[limit - 1].created_at, donations[limit - 1].id))
+        if len(donations) > limit
+        else None
+    )
+    return schemas.DonationPageResponse(
+        items=[donation_response(donation) for donation in donations[:limit]],
+        next_cursor=next_cursor,
+    )
@@ -1,28 +1,34 @@
-from pydantic import UUID4, Field
+from pydantic import UUID4
 from pydantic.networks import HttpUrl
 from pydantic.types import NaiveDatetime
 
-from src.schemas import CustomModel
+from src.schemas import CursorPage, CustomModel
 
 
 class CampaignResponse(CustomModel):
     id: UUID4
     title: str
     description: str
-    image: str
+    image_url: str
+    image: str | None = None
     goal: int
     amt_reached: int
-    percent_reached: float = Field(le=100.0)
+    percent_reached: float
     category: list[str]
     no_of_reactions: int
     no_of_donors: int
     deadline: NaiveDatetime | None
 
 
+class CampaignPageResponse(CursorPage[CampaignResponse]):
+    pass
+
+
 class FeedResponse(CustomModel):
     id: UUID4
     text: str
-    media: list[str] | None
+    media_urls: list[str]
+    media: list[str] | None = None
     no_of_reactions: int
 
 
@@ -51,9 +57,29 @@ class SaveDonationRequest(CustomModel):
     recovery_acct_name: str
 
 
+class BulkDonationRecord(SaveDonationRequest):
+    campaign_id: UUID4
+
+
+class DonationIngestError(CustomModel):
+    line: int
+    detail: str
+
+
+class DonationIngestResponse(CustomModel):
+    inserted: int
+    # already recorded donations, skipped
+    duplicates: int
+    errors: list[DonationIngestError]
+
+
 class DonationResponse(CustomModel):
     id: UUID4
     anonymous: bool
     name: str | None
     social_media_link: list[str] | None
     amount: float
+
+
+class DonationPageResponse(CursorPage[DonationResponse]):
+    pass
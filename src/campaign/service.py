@@ -1,30 +1,192 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
-from uuid import UUID
-
-from sqlalchemy import select
+from typing import NamedTuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    BigInteger,
+    Select,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from src.campaign.constants import CampaignProgress
+from sqlalchemy.orm import joinedload, load_only
+
+from src.cache import two_tier_cache
+from src.campaign import (
+    counters,
+    detail_cache,
+    exceptions,
+    images,
+    leaderboard,
+    schemas,
+)
+from src.campaign.constants import (
+    DONATION_STREAM_BATCH_SIZE,
+    IMAGE_VARIANT_CONTENT_TYPE,
+    CampaignProgress,
+    ImageVariant,
+)
 from src.campaign.models import (
+    CAMPAIGN_CARD_COLUMNS,
+    CAMPAIGN_REF_COLUMNS,
     Campaign,
+    CampaignCard,
+    CampaignCounterShard,
+    CampaignRef,
     Donation,
     FeedPost,
+    FeedPostMedium,
     UserCampaignReaction,
     UserFeedPostReaction,
 )
-from src.user.models import User
+from src.config import settings
+from src.storage import StoredBlob, blob_store
+from src.user.models import User, UserIdentity
+
+
+def popularity_sort_key(campaign: CampaignCard) -> tuple[int, int, UUID]:
+    return campaign.no_of_reactions, campaign.no_of_supporters, campaign.id
 
 
+# ordered by the counters including pending shards, as the leaderboard is, so
+# a cursor from a leaderboard page continues here without skips or repeats
 async def retrieve_campaigns_with_highest_reactions_and_donors(
-    db: AsyncSession, limit: int, skip: int
-) -> list[Campaign]:
-    query_scalars = await db.scalars(
-        select(Campaign)
-        .order_by(Campaign.no_of_reactions.desc(), Campaign.no_of_supporters.desc())
+    db: AsyncSession, limit: int, after: tuple[int, int, UUID] | None = None
+) -> list[CampaignCard]:
+    pending = counters.pending_subquery()
+    no_of_reactions = Campaign.no_of_reactions + func.coalesce(
+        pending.c.no_of_reactions, 0
+    )
+    no_of_supporters = Campaign.no_of_supporters + func.coalesce(
+        pending.c.no_of_supporters, 0
+    )
+    # sum() of a bigint is a numeric
+    amt_reached = Campaign.amt_reached + cast(
+        func.coalesce(pending.c.amt_reached, 0), BigInteger
+    )
+    live_columns = {
+        "no_of_reactions": no_of_reactions.label("no_of_reactions"),
+        "no_of_supporters": no_of_supporters.label("no_of_supporters"),
+        "amt_reached": amt_reached.label("amt_reached"),
+    }
+    popularity = tuple_(no_of_reactions, no_of_supporters, Campaign.id)
+    query = (
+        select(
+            *(live_columns.get(column.key, column) for column in CAMPAIGN_CARD_COLUMNS)
+        )
+        .outerjoin(pending, pending.c.campaign_id == Campaign.id)
+        .order_by(
+            no_of_reactions.desc(),
+            no_of_supporters.desc(),
+            Campaign.id.desc(),
+        )
         .limit(limit)
-        .offset(skip)
     )
-    return list(query_scalars.all())
+    if after:
+        query = query.where(popularity < tuple_(*after))
+    query_result = await db.execute(query)
+    return [CampaignCard(*row) for row in query_result]
+
+
+async def add_pending_counters(
+    db: AsyncSession, cards: list[CampaignCard]
+) -> list[CampaignCard]:
+    pending_counters = await counters.get_pending(db, [card.id for card in cards])
+    return [
+        card._replace(
+            no_of_reactions=card.no_of_reactions + pending.no_of_reactions,
+            no_of_supporters=card.no_of_supporters + pending.no_of_supporters,
+            amt_reached=card.amt_reached + pending.amt_reached,
+        )
+        if (pending := pending_counters.get(card.id))
+        else card
+        for card in cards
+    ]
+
+
+async def get_campaign_cards(
+    db: AsyncSession, campaign_ids: list[UUID]
+) -> list[CampaignCard]:
+    query_result = await db.execute(
+        select(*CAMPAIGN_CARD_COLUMNS).where(Campaign.id.in_(campaign_ids))
+    )
+    return await add_pending_counters(db, [CampaignCard(*row) for row in query_result])
+
+
+# the same pages, from the redis leaderboard when it is available
+async def retrieve_popular_campaigns(
+    db: AsyncSession, limit: int, after: tuple[int, int, UUID] | None = None
+) -> list[CampaignCard]:
+    campaign_ids = await leaderboard.get_campaign_ids(limit, after)
+    if campaign_ids is None:
+        return await retrieve_campaigns_with_highest_reactions_and_donors(
+            db, limit, after
+        )
+
+    cards = await leaderboard.get_cached_cards(campaign_ids)
+    missing_ids = [
+        campaign_id for campaign_id in campaign_ids if campaign_id not in cards
+    ]
+    if missing_ids:
+        missing_cards = await get_campaign_cards(db, missing_ids)
+        await leaderboard.cache_cards(missing_cards)
+        cards.update((card.id, card) for card in missing_cards)
+    # campaigns deleted since they were ranked are skipped
+    return [cards[campaign_id] for campaign_id in campaign_ids if campaign_id in cards]
+
+
+class CampaignDetail(NamedTuple):
+    campaign: Campaign
+    beneficiary_user: User | None
+    counters: counters.CampaignCounters
+
+
+# one statement: feed posts with their media, the beneficiary and the
+# pending counters
+async def get_campaign_detail(
+    db: AsyncSession, campaign_id: UUID
+) -> CampaignDetail | None:
+    pending = counters.pending_subquery([campaign_id])
+    query_result = await db.execute(
+        select(
+            Campaign,
+            User,
+            pending.c.no_of_reactions,
+            pending.c.no_of_supporters,
+            pending.c.amt_reached,
+        )
+        .outerjoin(User, User.id == Campaign.beneficiary_user_id)
+        .outerjoin(pending, pending.c.campaign_id == Campaign.id)
+        .options(
+            joinedload(Campaign.feed_posts).joinedload(FeedPost.media),
+            load_only(User.firstname, User.lastname, User.email),
+        )
+        .where(Campaign.id == campaign_id)
+    )
+    row = query_result.unique().one_or_none()
+    if row is None:
+        return None
+
+    campaign, beneficiary_user, *pending_counters = row
+    no_of_reactions, no_of_supporters, amt_reached = (
+        value or 0 for value in pending_counters
+    )
+    return CampaignDetail(
+        campaign=campaign,
+        beneficiary_user=beneficiary_user,
+        counters=counters.CampaignCounters(
+            no_of_reactions=campaign.no_of_reactions + no_of_reactions,
+            no_of_supporters=campaign.no_of_supporters + no_of_supporters,
+            amt_reached=campaign.amt_reached + amt_reached,
+        ),
+    )
 
 
 async def get_campaign(db: AsyncSession, campaign_id: UUID) -> Campaign | None:
@@ -32,6 +194,33 @@ async def get_campaign(db: AsyncSession, campaign_id: UUID) -> Campaign | None:
     return query_scalars.one_or_none()
 
 
+@two_tier_cache(
+    "campaign_ref",
+    CampaignRef,
+    ttl=settings.CAMPAIGN_REF_CACHE_TTL,
+    local_ttl=settings.CAMPAIGN_REF_LOCAL_CACHE_TTL,
+    maxsize=settings.CAMPAIGN_REF_CACHE_SIZE,
+)
+async def get_campaign_ref(db: AsyncSession, campaign_id: UUID) -> CampaignRef | None:
+    query_result = await db.execute(
+        select(*CAMPAIGN_REF_COLUMNS).where(Campaign.id == campaign_id)
+    )
+    row = query_result.one_or_none()
+    return CampaignRef(*row) if row else None
+
+
+async def get_feed_post_medium(
+    db: AsyncSession, feed_post_id: UUID, ordinal: int
+) -> FeedPostMedium | None:
+    query_scalars = await db.scalars(
+        select(FeedPostMedium).where(
+            FeedPostMedium.feed_post_id == feed_post_id,
+            FeedPostMedium.ordinal == ordinal,
+        )
+    )
+    return query_scalars.first()
+
+
 async def get_feed_post(db: AsyncSession, feed_post_id: UUID) -> FeedPost | None:
     query_scalars = await db.scalars(
         select(FeedPost).where(FeedPost.id == feed_post_id)
@@ -39,10 +228,23 @@ async def get_feed_post(db: AsyncSession, feed_post_id: UUID) -> FeedPost | None
     return query_scalars.one_or_none()
 
 
+async def store_header_img_variants(header_img: StoredBlob) -> dict[str, str]:
+    # worker processes read the image straight from disk when they can
+    source = blob_store.local_path(header_img.digest)
+    variants = await images.generate_variants(
+        str(source) if source else await blob_store.get(header_img.digest)
+    )
+    variant_digests: dict[str, str] = {}
+    for variant, variant_bytes in variants.items():
+        stored_variant = await blob_store.put(variant_bytes, IMAGE_VARIANT_CONTENT_TYPE)
+        variant_digests[variant.value] = stored_variant.digest
+    return variant_digests
+
+
 async def create_campaign(
     db: AsyncSession,
     title: str,
-    header_img: bytes,
+    header_img: StoredBlob,
     description: str,
     story: str,
     goal: int,
@@ -51,9 +253,12 @@ async def create_campaign(
     social_media_links: list[str],
     creator_id: UUID,
 ):
+    header_img_variants = await store_header_img_variants(header_img)
     campaign = Campaign(
         title=title,
-        header_img=header_img,
+        header_img_digest=header_img.digest,
+        header_img_size=header_img.size,
+        header_img_content_type=header_img.content_type,
         description=description,
         story=story,
         goal=goal,
@@ -62,6 +267,7 @@ async def create_campaign(
         social_media_links=social_media_links,
         creator_id=creator_id,
     )
+    campaign.header_img_variants = header_img_variants
     db.add(campaign)
     await db.flush()
     return campaign
@@ -71,7 +277,7 @@ async def update_campaign(
     db: AsyncSession,
     campaign: Campaign,
     title: str | None,
-    header_img: bytes | None,
+    header_img: StoredBlob | None,
     description: str | None,
     story: str | None,
     goal: int | None,
@@ -83,7 +289,11 @@ async def update_campaign(
     if title:
         campaign.title = title
     if header_img:
-        campaign.header_img = header_img
+        header_img_variants = await store_header_img_variants(header_img)
+        campaign.header_img_digest = header_img.digest
+        campaign.header_img_size = header_img.size
+        campaign.header_img_content_type = header_img.content_type
+        campaign.header_img_variants = header_img_variants
     if description:
         campaign.description = description
     if story:
@@ -103,36 +313,77 @@ async def update_campaign(
     return
 
 
-async def user_reaction_to_campaign_exists(
-    db: AsyncSession, campaign: Campaign, user: User
-) -> bool:
-    query_scalars = await db.scalars(
-        select(UserCampaignReaction).where(
-            UserCampaignReaction.campaign_id == campaign.id,
-            UserCampaignReaction.user_id == user.id,
+# campaigns without variants fall back to the original upload
+def get_header_img_digest(
+    campaign: Campaign | CampaignCard, variant: ImageVariant | None
+) -> tuple[str, str]:
+    if variant and (variant_digest := campaign.header_img_variants.get(variant.value)):
+        return variant_digest, IMAGE_VARIANT_CONTENT_TYPE
+    return campaign.header_img_digest, campaign.header_img_content_type
+
+
+async def get_campaign_header_img(
+    campaign: Campaign | CampaignCard, variant: ImageVariant | None = None
+) -> bytes:
+    digest, _ = get_header_img_digest(campaign, variant)
+    return await blob_store.get(digest)
+
+
+async def retrieve_campaigns_without_header_img_variants(
+    db: AsyncSession, after_id: UUID | None, limit: int
+) -> list[Campaign]:
+    query = (
+        select(Campaign)
+        .where(Campaign.header_img_variants == {})
+        .order_by(Campaign.id)
+        .limit(limit)
+    )
+    if after_id:
+        query = query.where(Campaign.id > after_id)
+    query_scalars = await db.scalars(query)
+    return list(query_scalars.all())
+
+
+async def add_header_img_variants(campaign: Campaign) -> None:
+    campaign.header_img_variants = await store_header_img_variants(
+        StoredBlob(
+            digest=campaign.header_img_digest,
+            size=campaign.header_img_size,
+            content_type=campaign.header_img_content_type,
         )
     )
-    user_campaign_reaction = query_scalars.one_or_none()
-    if user_campaign_reaction:
-        return True
-    return False
 
 
+# the unique (user_id, campaign_id) constraint turns a repeated reaction
+# into a no-op, and then the shard update touches no row
 async def user_reaction_to_campaign(
-    db: AsyncSession, campaign: Campaign, user: User
+    db: AsyncSession, campaign: CampaignRef, user: UserIdentity
 ) -> None:
-    user_campaign_reaction = UserCampaignReaction(
-        user_id=user.id, campaign_id=campaign.id
+    reaction = (
+        insert(UserCampaignReaction)
+        .values(id=uuid4(), user_id=user.id, campaign_id=campaign.id)
+        .on_conflict_do_nothing(
+            index_elements=[
+                UserCampaignReaction.user_id,
+                UserCampaignReaction.campaign_id,
+            ]
+        )
+        .returning(UserCampaignReaction.campaign_id)
+        .cte("reaction")
     )
-    campaign.no_of_reactions += 1
-
-    db.add(user_campaign_reaction)
-    db.add(campaign)
-    return
+    reacted_campaign_id = await db.scalar(
+        counters.upsert_shard(
+            select(reaction.c.campaign_id, literal(counters.random_slot()), literal(1)),
+            ["no_of_reactions"],
+        ).returning(CampaignCounterShard.campaign_id)
+    )
+    if reacted_campaign_id is None:
+        raise exceptions.UserAlreadyReacted()
 
 
-async def delete_campaign(db: AsyncSession, campaign: Campaign) -> None:
-    await db.delete(campaign)
+async def delete_campaign(db: AsyncSession, campaign: CampaignRef) -> None:
+    # the campaign's rows are removed by the foreign keys' ON DELETE actions
+    await db.execute(delete(Campaign).where(Campaign.id == campaign.id))
     return
 
 
@@ -144,65 +395,85 @@ async def add_beneficiary_to_campaign(
     return
 
 
+def build_feed_post_media(media: list[StoredBlob]) -> list[FeedPostMedium]:
+    return [
+        FeedPostMedium(
+            ordinal=ordinal,
+            digest=medium.digest,
+            size=medium.size,
+            content_type=medium.content_type,
+        )
+        for ordinal, medium in enumerate(media)
+    ]
+
+
 async def create_feed_post(
     db: AsyncSession,
     text: str,
-    media: list[bytes] | None,
+    media: list[StoredBlob] | None,
     creator_id: UUID,
-    campaign: Campaign,
+    campaign: CampaignRef,
 ) -> FeedPost:
-    feed_post = FeedPost(
-        text=text, media=media, creator_id=creator_id, campaign=campaign
-    )
+    feed_post = FeedPost(text=text, creator_id=creator_id, campaign_id=campaign.id)
+    feed_post.media = build_feed_post_media(media or [])
     db.add(feed_post)
     await db.flush()
     return feed_post
 
 
 async def update_feed_post(
-    db: AsyncSession, feed_post: FeedPost, text: str | None, media: list[bytes] | None
+    db: AsyncSession,
+    feed_post: FeedPost,
+    text: str | None,
+    media: list[StoredBlob] | None,
 ) -> None:
     if text:
         feed_post.text = text
     if media:
-        feed_post.media = media
+        feed_post.media = build_feed_post_media(media)
 
     db.add(feed_post)
     return
 
 
-async def user_reaction_to_feed_post_exists(
-    db: AsyncSession, feed_post: FeedPost, user: User
-) -> bool:
-    query_scalars = await db.scalars(
-        select(UserFeedPostReaction).where(
-            UserFeedPostReaction.feed_post_id == feed_post.id,
-            UserFeedPostReaction.user_id == user.id,
+# see user_reaction_to_campaign; returns the new number of reactions
+async def user_reaction_to_feed_post(
+    db: AsyncSession, feed_post: FeedPost, user: UserIdentity
+) -> int:
+    reaction = (
+        insert(UserFeedPostReaction)
+        .values(id=uuid4(), user_id=user.id, feed_post_id=feed_post.id)
+        .on_conflict_do_nothing(
+            index_elements=[
+                UserFeedPostReaction.user_id,
+                UserFeedPostReaction.feed_post_id,
+            ]
         )
+        .returning(UserFeedPostReaction.feed_post_id)
+        .cte("reaction")
     )
-    user_feed_post_reation = query_scalars.one_or_none()
-    if user_feed_post_reation:
-        return True
-    return False
-
-
-async def user_reaction_to_feed_post(
-    db: AsyncSession, feed_post: FeedPost, user: User
-) -> None:
-    user_feed_post_reaction = UserFeedPostReaction(
-        user_id=user.id, feed_post_id=feed_post.id
+    no_of_reactions = await db.scalar(
+        update(FeedPost)
+        .where(FeedPost.id == reaction.c.feed_post_id)
+        .values(no_of_reactions=FeedPost.no_of_reactions + 1)
+        .returning(FeedPost.no_of_reactions)
+        .execution_options(synchronize_session=False)
     )
-    feed_post.no_of_reactions += 1
-
-    db.add(user_feed_post_reaction)
-    db.add(feed_post)
-    return
+    if no_of_reactions is None:
+        raise exceptions.UserAlreadyReacted()
+    return no_of_reactions
 
 
 async def delete_feed_post(db: AsyncSession, feed_post: FeedPost) -> None:
     await db.delete(feed_post)
 
 
+def donation_amount(amount_received: float) -> int:
+    # amounts are stored as whole units; rounded once, here, for the donation
+    # row and the counters alike
+    return round(amount_received)
+
+
 async def create_donation(
     db: AsyncSession,
     payaza_reference: str,
@@ -214,29 +485,138 @@ async def create_donation(
     recovery_acct_no: int,
     recovery_acct_bank: str,
     recovery_acct_name: str,
-    campaign: Campaign,
-) -> None:
-    donation = Donation(
-        anonymous=anonymous,
-        payaza_reference=payaza_reference,
-        transaction_reference=transaction_reference,
-        name=name,
-        social_media_link=social_media_link,
-        recovery_acct_no=recovery_acct_no,
-        recovery_acct_bank=recovery_acct_bank,
-        recovery_acct_name=recovery_acct_name,
-        campaign=campaign,
-        amount=amount_received,
+    campaign: CampaignRef,
+) -> bool:
+    """Returns False when the donation was already recorded"""
+    amount = donation_amount(amount_received)
+    donation_id = await db.scalar(
+        insert(Donation)
+        .values(
+            id=uuid4(),
+            anonymous=anonymous,
+            payaza_reference=payaza_reference,
+            transaction_reference=transaction_reference,
+            name=name,
+            social_media_link=social_media_link,
+            recovery_acct_no=recovery_acct_no,
+            recovery_acct_bank=recovery_acct_bank,
+            recovery_acct_name=recovery_acct_name,
+            campaign_id=campaign.id,
+            amount=amount,
+        )
+        .on_conflict_do_nothing()
+        .returning(Donation.id)
+    )
+    if donation_id is None:
+        return False
+
+    await counters.increment(db, campaign.id, no_of_supporters=1, amt_reached=amount)
+    return True
+
+
+async def create_donations(
+    db: AsyncSession, donations: list[schemas.BulkDonationRecord]
+) -> dict[UUID, list[str]]:
+    """Returns the payaza references of the newly recorded donations, by campaign"""
+    query_result = await db.execute(
+        insert(Donation)
+        .on_conflict_do_nothing()
+        .returning(Donation.payaza_reference, Donation.campaign_id, Donation.amount),
+        [
+            {
+                "anonymous": donation.anonymous,
+                "payaza_reference": donation.payaza_reference,
+                "transaction_reference": donation.transaction_reference,
+                "name": donation.name,
+                "social_media_link": donation.social_media_links,
+                "recovery_acct_no": donation.recovery_acct_no,
+                "recovery_acct_bank": donation.recovery_acct_bank,
+                "recovery_acct_name": donation.recovery_acct_name,
+                "campaign_id": donation.campaign_id,
+                "amount": donation_amount(donation.amount_received),
+            }
+            for donation in donations
+        ],
     )
 
-    campaign.no_of_supporters += 1
-    db.add(donation)
-    db.add(campaign)
-    return
+    inserted_references: dict[UUID, list[str]] = {}
+    amounts: dict[UUID, int] = {}
+    for payaza_reference, campaign_id, amount in query_result:
+        inserted_references.setdefault(campaign_id, []).append(payaza_reference)
+        amounts[campaign_id] = amounts.get(campaign_id, 0) + amount
+    for campaign_id, references in inserted_references.items():
+        await counters.increment(
+            db,
+            campaign_id,
+            no_of_supporters=len(references),
+            amt_reached=amounts[campaign_id],
+        )
+    return inserted_references
 
 
-async def retrieve_user_campaigns(db: AsyncSession, user_id: UUID) -> list[Campaign]:
-    query_scalars = await db.scalars(
-        select(Campaign).where(Campaign.creator_id == user_id)
+def campaign_donations_query(campaign_id: UUID) -> Select[tuple[Donation]]:
+    return (
+        select(Donation)
+        .where(Donation.campaign_id == campaign_id)
+        .order_by(Donation.created_at.desc(), Donation.id.desc())
     )
+
+
+# newest first; `after` is the (created_at, id) of the previous page's last row
+async def retrieve_campaign_donations(
+    db: AsyncSession,
+    campaign_id: UUID,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> list[Donation]:
+    query = campaign_donations_query(campaign_id).limit(limit)
+    if after:
+        query = query.where(tuple_(Donation.created_at, Donation.id) < tuple_(*after))
+    query_scalars = await db.scalars(query)
     return list(query_scalars.all())
+
+
+# holds one batch of rows in memory; needs an open transaction
+async def stream_campaign_donations(
+    db: AsyncSession, campaign_id: UUID
+) -> AsyncIterator[Donation]:
+    donations = await db.stream_scalars(
+        campaign_donations_query(campaign_id).execution_options(
+            yield_per=DONATION_STREAM_BATCH_SIZE
+        )
+    )
+    async for donation in donations:
+        yield donation
+
+
+# invalidated when the user's campaigns change, but not on every donation or
+# reaction: their counters may lag by up to the cache TTL
+@two_tier_cache(
+    "user_campaigns",
+    list[CampaignCard],
+    ttl=settings.USER_CAMPAIGNS_CACHE_TTL,
+    local_ttl=settings.USER_CAMPAIGNS_LOCAL_CACHE_TTL,
+    maxsize=settings.USER_CAMPAIGNS_CACHE_SIZE,
+)
+async def retrieve_user_campaigns(
+    db: AsyncSession, user_id: UUID
+) -> list[CampaignCard]:
+    query_result = await db.execute(
+        select(*CAMPAIGN_CARD_COLUMNS).where(Campaign.creator_id == user_id)
+    )
+    return await add_pending_counters(db, [CampaignCard(*row) for row in query_result])
+
+
+async def invalidate_user_campaigns(user_id: UUID | None) -> None:
+    if user_id:
+        await retrieve_user_campaigns.invalidate(user_id)
+
+
+# cached views are dropped only once the change committed (routes add these as
+# background tasks), otherwise a concurrent request could cache the old rows
+# again before the commit
+async def invalidate_campaign(campaign_id: UUID, creator_id: UUID | None) -> None:
+    await leaderboard.invalidate_card(campaign_id)
+    await get_campaign_ref.invalidate(campaign_id)
+    await invalidate_user_campaigns(creator_id)
+    await detail_cache.invalidate(campaign_id)
@@ -0,0 +1,44 @@
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+
+from src.campaign.constants import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+
+def media_url(
+    request: Request,
+    route_name: str,
+    query_params: dict[str, str] | None = None,
+    **path_params: Any,
+) -> str:
+    """
+    Build a root-relative url to a binary media route. A `v` query param that
+    changes whenever the content does lets clients cache the url forever.
+    """
+    path = request.app.url_path_for(
+        route_name, **{name: str(value) for name, value in path_params.items()}
+    )
+    url = f"{request.scope.get('root_path', '')}{path}"
+    return f"{url}?{urlencode(query_params)}" if query_params else url
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    # weak comparison, as required for If-None-Match (RFC 9110 13.1.2)
+    return "*" in candidates or etag in {c.removeprefix("W/") for c in candidates}
+
+
+def cache_headers(etag: str, *, immutable: bool) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        ),
+    }
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
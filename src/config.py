@@ -1,9 +1,10 @@
 from typing import Any
 
-from pydantic.networks import PostgresDsn
+from pydantic import SecretStr
+from pydantic.networks import PostgresDsn, RedisDsn
 from pydantic_settings import BaseSettings
 
-from src.constants import Environment
+from src.constants import BlobStoreBackend, Environment
 
 
 class Config(BaseSettings):
@@ -12,6 +13,72 @@ class Config(BaseSettings):
     JWT_ALG: str
 
     DATABASE_URL: PostgresDsn
+    # features backed by redis fall back to postgres when it is not configured
+    REDIS_URL: RedisDsn | None = None
+    # connect over a unix socket instead of REDIS_URL
+    REDIS_UNIX_SOCKET_PATH: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    # seconds
+    REDIS_POOL_TIMEOUT: float = 1.0
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    BLOB_STORE_BACKEND: BlobStoreBackend = BlobStoreBackend.LOCAL
+    BLOB_STORE_ROOT: str = "storage/blobs"
+    # embed base64 encoded images in JSON responses for clients that predate
+    # the dedicated image endpoints
+    LEGACY_INLINE_MEDIA: bool = False
+
+    IMAGE_PROCESSING_WORKERS: int = 2
+
+    # bcrypt runs on this many threads; past MAX_PENDING hashes in flight,
+    # requests wait up to QUEUE_TIMEOUT seconds for a slot, then get a 503
+    PASSWORD_HASHING_WORKERS: int = 2
+    PASSWORD_HASHING_MAX_PENDING: int = 32
+    PASSWORD_HASHING_QUEUE_TIMEOUT: float = 2.0
+
+    # upload limits, in bytes
+    MAX_UPLOAD_FILE_SIZE: int = 10 * 1024 * 1024
+    MAX_UPLOAD_REQUEST_SIZE: int = 40 * 1024 * 1024
+
+    CAMPAIGN_CARD_CACHE_TTL: int = 10 * 60
+    # two tier caches: redis TTL, per worker TTL and per worker entries
+    CAMPAIGN_REF_CACHE_TTL: int = 10 * 60
+    CAMPAIGN_REF_LOCAL_CACHE_TTL: int = 60
+    CAMPAIGN_REF_CACHE_SIZE: int = 10_000
+    USER_CAMPAIGNS_CACHE_TTL: int = 60
+    USER_CAMPAIGNS_LOCAL_CACHE_TTL: int = 10
+    USER_CAMPAIGNS_CACHE_SIZE: int = 1000
+    USER_IDENTITY_CACHE_TTL: int = 10 * 60
+    USER_IDENTITY_LOCAL_CACHE_TTL: int = 60
+    USER_IDENTITY_CACHE_SIZE: int = 10_000
+
+    # campaign detail bodies are served fresh, then stale while one worker
+    # rebuilds them; builders hold a redis lock for at most LOCK_TIMEOUT
+    CAMPAIGN_DETAIL_FRESH_TTL: int = 5
+    CAMPAIGN_DETAIL_STALE_TTL: int = 60
+    CAMPAIGN_DETAIL_LOCK_TIMEOUT: float = 5.0
+
+    RATE_LIMIT_ENABLED: bool = True
+    # keys tracked per limiter by the in-process fallback used without redis
+    RATE_LIMIT_LOCAL_BUCKETS: int = 10_000
+
+    # decoded access tokens cached per worker
+    ACCESS_TOKEN_CACHE_SIZE: int = 10_000
+
+    # campaign counter writes are spread over this many rows per campaign and
+    # folded back into the campaign row every interval (seconds)
+    CAMPAIGN_COUNTER_SHARDS: int = 16
+    CAMPAIGN_COUNTER_COMPACTION_INTERVAL: int = 60
+
+    # bulk donation ingestion and /metrics/cache are disabled until a key is set
+    DONATION_INGEST_API_KEY: SecretStr | None = None
+    DONATION_INGEST_BATCH_SIZE: int = 1000
+
+    # seconds a recorded payaza reference is remembered in redis, and how long
+    # a reference stays claimed by a request that is still recording it
+    DONATION_IDEMPOTENCY_TTL: int = 24 * 60 * 60
+    DONATION_IDEMPOTENCY_CLAIM_TTL: int = 60
 
     APP_VERSION: int = 1
 
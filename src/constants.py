@@ -32,6 +32,13 @@ class Environment(str, Enum):
         return self in (self.STAGING, self.PRODUCTION)
 
 
+class BlobStoreBackend(str, Enum):
+    LOCAL = "LOCAL"
+
+
+UPLOAD_CHUNK_SIZE: Final[int] = 256 * 1024
+
+
 # cascade option - refresh-expire has to be excluded for async sessions.
 # https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html#asyncio-orm-avoid-lazyloads
 SA_RELATIONS_CASCADE_OPTIONS: Final[str] = (
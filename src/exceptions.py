@@ -25,6 +25,15 @@ class BadRequest(DetailedHTTPException):
     DETAIL = "Bad request"
 
 
+class InvalidCursor(BadRequest):
+    DETAIL = "Invalid pagination cursor"
+
+
+class PayloadTooLarge(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    DETAIL = "Payload too large"
+
+
 class NotAuthenticated(DetailedHTTPException):
     STATUS_CODE = status.HTTP_401_UNAUTHORIZED
     DETAIL = "User not authenticated"
@@ -33,6 +42,19 @@ class NotAuthenticated(DetailedHTTPException):
         super().__init__(**kwargs)
 
 
+class TooManyRequests(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_429_TOO_MANY_REQUESTS
+    DETAIL = "Too many requests"
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(headers={"Retry-After": str(retry_after)})
+
+
+class ServiceUnavailable(DetailedHTTPException):
+    STATUS_CODE = status.HTTP_503_SERVICE_UNAVAILABLE
+    DETAIL = "Service unavailable"
+
+
 class InternalError(DetailedHTTPException):
     STATUS_CODE = status.HTTP_500_INTERNAL_SERVER_ERROR
     DETAIL = "Internal server error"
@@ -1,13 +1,43 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from scalar_fastapi import get_scalar_api_reference
 
+from src.cache import get_cache_stats, listen_for_invalidations
+from src.campaign import counters, images, leaderboard
+from src.campaign.dependencies import validate_ingest_api_key
 from src.campaign.router import campaign_router
-from src.config import app_configs
+from src.config import app_configs, settings
+from src.middleware import RequestBodyLimitMiddleware
+from src.redis import close_redis_client, init_redis_client
+from src.user import security
 from src.user.router import user_router
 
-app = FastAPI(**app_configs)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    await init_redis_client()
+    await leaderboard.build_if_missing()
+    counter_compaction = asyncio.create_task(
+        counters.compact_periodically(settings.CAMPAIGN_COUNTER_COMPACTION_INTERVAL)
+    )
+    cache_invalidation = asyncio.create_task(listen_for_invalidations())
+    yield
+    cache_invalidation.cancel()
+    counter_compaction.cancel()
+    await close_redis_client()
+    images.shutdown_executor()
+    security.shutdown_executor()
+
+
+app = FastAPI(**app_configs, lifespan=lifespan)
+
+app.add_middleware(
+    RequestBodyLimitMiddleware, max_body_size=settings.MAX_UPLOAD_REQUEST_SIZE
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +60,16 @@ async def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+# operators only: the same api key as bulk donation ingestion
+@app.get(
+    "/metrics/cache",
+    include_in_schema=False,
+    dependencies=[Depends(validate_ingest_api_key)],
+)
+async def cache_metrics() -> dict[str, dict[str, Any]]:
+    return get_cache_stats()
+
+
 @app.get("/scalar", include_in_schema=False)
 async def scalar_html():
     return get_scalar_api_reference(
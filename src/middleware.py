@@ -0,0 +1,53 @@
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.exceptions import PayloadTooLarge
+
+
+class RequestBodyLimitMiddleware:
+    """
+    Reject multipart (upload) requests whose body exceeds `max_body_size`.
+
+    A declared Content-Length over the limit is answered with 413 before any
+    of the body is read; otherwise bytes are counted as they are received and
+    the request is aborted the moment the limit is crossed.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                response = JSONResponse(
+                    {"detail": PayloadTooLarge.DETAIL},
+                    status_code=PayloadTooLarge.STATUS_CODE,
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # surfaces through fastapi's body parsing as a 413 response
+                    raise PayloadTooLarge()
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,25 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any, Sequence
+
+from fastapi.encoders import jsonable_encoder
+
+from src.exceptions import InvalidCursor
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    payload = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list[Any]:
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(padded_cursor.encode()))
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise InvalidCursor()
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor()
+    return values
@@ -0,0 +1,101 @@
+"""
+Sliding window rate limits in redis, falling back to a per worker token
+bucket while redis is unavailable.
+"""
+
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from uuid import uuid4
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from src.cache import TTLLRUCache
+from src.config import settings
+from src.exceptions import TooManyRequests
+from src.redis import get_redis_client, is_redis_configured
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "ratelimit:{}:{}"
+
+# KEYS[1]: window set, ARGV: window (ms), limit, member
+# returns 0 when the hit is allowed, else the milliseconds until it would be
+_SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+
+class RateLimiter:
+    def __init__(self, name: str, limit: int, window: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+        # key -> (tokens left, monotonic time of the last refill)
+        self._local_buckets: TTLLRUCache[str, tuple[float, float]] = TTLLRUCache(
+            f"ratelimit:{name}",
+            maxsize=settings.RATE_LIMIT_LOCAL_BUCKETS,
+            ttl=window,
+        )
+
+    async def hit(self, key: str) -> None:
+        """Record a request for `key`, raising `TooManyRequests` over the limit"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        if not is_redis_configured():
+            retry_after = self.take_local_token(key)
+        else:
+            retry_after = await self.take_redis_hit(key)
+        if retry_after:
+            raise TooManyRequests(retry_after=math.ceil(retry_after))
+
+    async def take_redis_hit(self, key: str) -> float:
+        """Sliding window hit; returns 0 or the seconds until one is allowed"""
+        try:
+            retry_after_ms = await get_redis_client().eval(
+                _SLIDING_WINDOW_SCRIPT,
+                1,
+                RATE_LIMIT_KEY.format(self.name, key),
+                self.window * 1000,
+                self.limit,
+                uuid4().hex,
+            )
+            return retry_after_ms / 1000
+        except RedisError as error:
+            logger.warning("rate limit %s falls back to local: %r", self.name, error)
+            return self.take_local_token(key)
+
+    def take_local_token(self, key: str) -> float:
+        """Token bucket fallback; returns 0 or the seconds until a token is free"""
+        now = time.monotonic()
+        rate = self.limit / self.window
+        tokens, updated_at = self._local_buckets.get(key) or (self.limit, now)
+        tokens = min(self.limit, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            self._local_buckets.set(key, (tokens, now))
+            return (1 - tokens) / rate
+        self._local_buckets.set(key, (tokens - 1, now))
+        return 0
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(limiter: RateLimiter) -> Callable[[Request], Awaitable[None]]:
+    async def rate_limit_by_ip(request: Request) -> None:
+        await limiter.hit(client_ip(request))
+
+    return rate_limit_by_ip
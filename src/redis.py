@@ -1,31 +1,139 @@
+"""
+Shared redis client. Without redis configured the helpers below read nothing
+and write nothing; check `is_redis_configured` before using the client or
+`pipeline` directly.
+"""
+
+from collections.abc import AsyncIterator, Mapping, Sequence
+from contextlib import asynccontextmanager
 from datetime import timedelta
-from typing import Optional
+from typing import Any, TypeVar
+
+import msgpack
+from pydantic import TypeAdapter
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import UnixDomainSocketConnection
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.config import settings
+
+T = TypeVar("T")
+
+# delete a lock only if the caller still holds it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+redis_pool: BlockingConnectionPool | None = None
+redis_client: Redis | None = None
+
+
+def build_connection_pool() -> BlockingConnectionPool | None:
+    options: dict[str, Any] = {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+    }
+    if settings.REDIS_UNIX_SOCKET_PATH:
+        return BlockingConnectionPool(
+            connection_class=UnixDomainSocketConnection,
+            path=settings.REDIS_UNIX_SOCKET_PATH,
+            **options,
+        )
+    if settings.REDIS_URL:
+        return BlockingConnectionPool.from_url(str(settings.REDIS_URL), **options)
+    return None
+
+
+async def init_redis_client() -> None:
+    global redis_pool, redis_client
+    redis_pool = build_connection_pool()
+    if redis_pool is not None:
+        redis_client = Redis(connection_pool=redis_pool)
+
 
-from redis.asyncio import Redis
+async def close_redis_client() -> None:
+    global redis_pool, redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+    if redis_pool is not None:
+        await redis_pool.aclose()
+        redis_pool = None
 
-from src.schemas import CustomModel
 
-redis_client: Redis = None  # type: ignore
+def is_redis_configured() -> bool:
+    return redis_client is not None
 
 
-class RedisData(CustomModel):
-    key: bytes | str
-    value: bytes | str
-    ttl: Optional[int | timedelta] = None
+def get_redis_client() -> Redis:
+    """Return the shared client, raising a `RedisError` when redis is not set up"""
+    if redis_client is None:
+        raise RedisConnectionError("Redis client is not initialized")
+    return redis_client
 
 
-async def set_redis_key(redis_data: RedisData, *, is_transaction: bool = False) -> None:
-    async with redis_client.pipeline(transaction=is_transaction) as pipe:
-        await pipe.set(redis_data.key, redis_data.value)
-        if redis_data.ttl:
-            await pipe.expire(redis_data.key, redis_data.ttl)
+def pack(adapter: TypeAdapter[T], value: T) -> bytes:
+    return msgpack.packb(adapter.dump_python(value, mode="json"), use_bin_type=True)
 
+
+def unpack(adapter: TypeAdapter[T], data: bytes) -> T | None:
+    """Decode a cached value; values that no longer decode are cache misses"""
+    try:
+        return adapter.validate_python(msgpack.unpackb(data, raw=False))
+    except (ValueError, msgpack.UnpackException):
+        return None
+
+
+@asynccontextmanager
+async def pipeline(*, transaction: bool = False) -> AsyncIterator[Pipeline]:
+    """Queue commands on the yielded pipeline; they are sent in one round trip"""
+    async with get_redis_client().pipeline(transaction=transaction) as pipe:
+        yield pipe
         await pipe.execute()
 
 
-async def get_by_key(key: str) -> Optional[str]:
-    return await redis_client.get(key)
+async def mget(adapter: TypeAdapter[T], keys: Sequence[str]) -> list[T | None]:
+    if not keys or not is_redis_configured():
+        return [None] * len(keys)
+    values = await get_redis_client().mget(keys)
+    return [None if value is None else unpack(adapter, value) for value in values]
+
+
+async def mset_many(
+    adapter: TypeAdapter[T],
+    values: Mapping[str, T],
+    ttl: int | timedelta | None = None,
+) -> None:
+    """Set every key, each with the same TTL, in one round trip"""
+    if not values or not is_redis_configured():
+        return
+    async with pipeline() as pipe:
+        for key, value in values.items():
+            pipe.set(key, pack(adapter, value), ex=ttl)
+
+
+async def set_redis_key(
+    key: str, value: bytes | str, ttl: int | timedelta | None = None
+) -> None:
+    await get_redis_client().set(key, value, ex=ttl)
+
+
+async def get_by_key(key: str) -> bytes | None:
+    return await get_redis_client().get(key)
+
+
+async def delete_by_key(*keys: str) -> None:
+    if keys and is_redis_configured():
+        await get_redis_client().delete(*keys)
 
 
-async def delete_by_key(key: str) -> None:
-    return await redis_client.delete(key)
+async def release_lock(key: str, token: str) -> None:
+    if is_redis_configured():
+        await get_redis_client().eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
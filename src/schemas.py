@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Generic, TypeVar
 from zoneinfo import ZoneInfo
 
 from fastapi.encoders import jsonable_encoder
@@ -35,3 +35,11 @@ class CustomModel(BaseModel):
         default_dict = self.model_dump()
 
         return jsonable_encoder(default_dict)
+
+
+T = TypeVar("T")
+
+
+class CursorPage(CustomModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable
+from pathlib import Path
+from typing import IO, NamedTuple
+
+from anyio import CancelScope, to_thread
+
+from src.config import settings
+from src.constants import BlobStoreBackend
+
+
+class StoredBlob(NamedTuple):
+    digest: str
+    size: int
+    content_type: str
+
+
+def compute_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobWriter(ABC):
+    """Incrementally written blob, only addressable once committed"""
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    def commit(self, digest: str) -> None: ...
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for binary objects (images, media).
+    Blobs are identified by the hex encoded SHA-256 digest of their content,
+    so storing identical content twice results in a single stored object.
+
+    Backends implement the blocking primitives; the async API runs them in a
+    worker thread so the event loop is never blocked on storage I/O.
+    """
+
+    @abstractmethod
+    def open_writer_sync(self) -> BlobWriter: ...
+
+    @abstractmethod
+    def read_sync(self, digest: str) -> bytes: ...
+
+    @abstractmethod
+    def exists_sync(self, digest: str) -> bool: ...
+
+    @abstractmethod
+    def delete_sync(self, digest: str) -> None: ...
+
+    def local_path(self, digest: str) -> Path | None:
+        """Filesystem path of a blob, for backends that keep blobs on local disk"""
+        return None
+
+    def put_sync(self, data: bytes, content_type: str) -> StoredBlob:
+        digest = compute_digest(data)
+        if not self.exists_sync(digest):
+            writer = self.open_writer_sync()
+            try:
+                writer.write(data)
+                writer.commit(digest)
+            except BaseException:
+                writer.abort()
+                raise
+        return StoredBlob(digest=digest, size=len(data), content_type=content_type)
+
+    async def put(self, data: bytes, content_type: str) -> StoredBlob:
+        return await to_thread.run_sync(self.put_sync, data, content_type)
+
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], content_type: str
+    ) -> StoredBlob:
+        """
+        Store a blob from an async stream of chunks, hashing them as they are
+        written so the whole blob is never held in memory.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        writer = await to_thread.run_sync(self.open_writer_sync)
+        try:
+            async for chunk in chunks:
+                hasher.update(chunk)
+                size += len(chunk)
+                await to_thread.run_sync(writer.write, chunk)
+            digest = hasher.hexdigest()
+            await to_thread.run_sync(writer.commit, digest)
+        except BaseException:
+            with CancelScope(shield=True):
+                await to_thread.run_sync(writer.abort)
+            raise
+        return StoredBlob(digest=digest, size=size, content_type=content_type)
+
+    async def get(self, digest: str) -> bytes:
+        return await to_thread.run_sync(self.read_sync, digest)
+
+    async def exists(self, digest: str) -> bool:
+        return await to_thread.run_sync(self.exists_sync, digest)
+
+    async def delete(self, digest: str) -> None:
+        await to_thread.run_sync(self.delete_sync, digest)
+
+
+class LocalBlobWriter(BlobWriter):
+    def __init__(self, store: "LocalBlobStore") -> None:
+        self.store = store
+        # temp files live under the store root, so committing is an atomic rename
+        store.tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self.tmp_path = Path(tmp_path)
+        self.tmp_file: IO[bytes] = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.tmp_file.write(chunk)
+
+    def commit(self, digest: str) -> None:
+        self.tmp_file.close()
+        path = self.store.path_for(digest)
+        if path.exists():
+            # identical content is already stored
+            self.tmp_path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.tmp_path, path)
+
+    def abort(self) -> None:
+        self.tmp_file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Store blobs on the local filesystem, sharded by the first two bytes of the
+    digest (``ab/cd/abcd...``) to keep directory sizes bounded.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+        self.tmp_dir = self.root / ".tmp"
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def local_path(self, digest: str) -> Path | None:
+        return self.path_for(digest)
+
+    def open_writer_sync(self) -> BlobWriter:
+        return LocalBlobWriter(self)
+
+    def read_sync(self, digest: str) -> bytes:
+        return self.path_for(digest).read_bytes()
+
+    def exists_sync(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    def delete_sync(self, digest: str) -> None:
+        self.path_for(digest).unlink(missing_ok=True)
+
+
+def get_blob_store() -> BlobStore:
+    match settings.BLOB_STORE_BACKEND:
+        case BlobStoreBackend.LOCAL:
+            return LocalBlobStore(settings.BLOB_STORE_ROOT)
+
+
+blob_store = get_blob_store()
@@ -0,0 +1,101 @@
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.campaign.models import Campaign
+from src.database import metadata
+from src.user.models import Gender, User
+
+# tests using the database run against this one; its tables are created and
+# dropped by the tests, so never point it at a database you care about
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# connections shared by the concurrent sessions of a test
+TEST_DATABASE_POOL_SIZE = 20
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def db_engine(anyio_backend: str) -> AsyncIterator[AsyncEngine]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        pool_size=TEST_DATABASE_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=60,
+    )
+    # an unreachable database fails the tests rather than skipping them
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.drop_all)
+        await connection.run_sync(metadata.create_all)
+
+    yield engine
+
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def db_sessionmaker(db_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=db_engine, expire_on_commit=False)
+
+
+def build_user() -> User:
+    return User(
+        id=uuid4(),
+        email=f"{uuid4().hex}@example.com",
+        gender=Gender.female,
+        firstname="Ada",
+        lastname="Obi",
+        password="not-a-hash",
+    )
+
+
+@pytest.fixture
+def create_users(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+) -> Callable[[int], Awaitable[list[User]]]:
+    async def create(count: int) -> list[User]:
+        users = [build_user() for _ in range(count)]
+        async with db_sessionmaker.begin() as db:
+            db.add_all(users)
+        return users
+
+    return create
+
+
+@pytest.fixture
+async def campaign(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    create_users: Callable[[int], Awaitable[list[User]]],
+) -> Campaign:
+    [creator] = await create_users(1)
+    campaign = Campaign(
+        title="Borehole for Ikot",
+        header_img_digest="0" * 64,
+        header_img_size=1,
+        header_img_content_type="image/png",
+        description="Clean water",
+        story="A long story",
+        goal=1_000_000,
+        deadline=None,
+        category=["community"],
+        social_media_links=[],
+        creator_id=creator.id,
+    )
+    async with db_sessionmaker.begin() as db:
+        db.add(campaign)
+    return campaign
@@ -0,0 +1,50 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.campaign import service
+
+pytestmark = pytest.mark.anyio
+
+LARGE_COLUMNS = ("story", "social_media_links")
+
+
+class StatementRecorder:
+    """Stands in for the session, recording statements instead of running them"""
+
+    def __init__(self) -> None:
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return []
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize(
+    "retrieve",
+    [
+        lambda db: service.retrieve_campaigns_with_highest_reactions_and_donors(db, 10),
+        lambda db: service.retrieve_campaigns_with_highest_reactions_and_donors(
+            db, 10, (5, 3, uuid4())
+        ),
+        lambda db: service.retrieve_popular_campaigns(db, 10),
+        lambda db: service.get_campaign_cards(db, [uuid4()]),
+        lambda db: service.retrieve_user_campaigns.func(db, uuid4()),
+    ],
+    ids=["popular", "popular_next_page", "leaderboard", "cards", "user_campaigns"],
+)
+async def test_card_queries_skip_large_columns(retrieve) -> None:
+    db = StatementRecorder()
+    await retrieve(db)
+
+    assert db.statements
+    for statement in db.statements:
+        sql = compile_sql(statement)
+        assert "campaign.id" in sql
+        for column in LARGE_COLUMNS:
+            assert column not in sql
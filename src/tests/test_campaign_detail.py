@@ -0,0 +1,55 @@
+from collections.abc import Awaitable, Callable
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.campaign import counters, service
+from src.campaign.models import Campaign, CampaignRef
+from src.storage import StoredBlob
+from src.user.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_campaign_detail_is_one_statement(
+    db_engine: AsyncEngine,
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    create_users: Callable[[int], Awaitable[list[User]]],
+    campaign: Campaign,
+) -> None:
+    [beneficiary] = await create_users(1)
+    campaign_ref = CampaignRef(
+        campaign.id, campaign.creator_id, campaign.progress, campaign.deadline
+    )
+    media = [StoredBlob(f"{ordinal}" * 64, 1, "image/png") for ordinal in range(3)]
+    async with db_sessionmaker.begin() as db:
+        for text in ("First update", "Second update"):
+            await service.create_feed_post(
+                db, text, media, campaign.creator_id, campaign_ref
+            )
+        await service.add_beneficiary_to_campaign(
+            db, await db.get(Campaign, campaign.id), beneficiary.id
+        )
+        await counters.increment(db, campaign.id, no_of_reactions=3)
+
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record_statement)
+    try:
+        async with db_sessionmaker() as db:
+            detail = await service.get_campaign_detail(db, campaign.id)
+            # lazy loads would fail here rather than run another statement
+            assert detail is not None
+            feed_posts = detail.campaign.feed_posts
+            assert [len(feed_post.media) for feed_post in feed_posts] == [3, 3]
+            assert detail.beneficiary_user is not None
+            assert detail.beneficiary_user.email == beneficiary.email
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record_statement)
+
+    assert len(statements) == 1
+    assert detail.counters.no_of_reactions == 3
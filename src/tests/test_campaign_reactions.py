@@ -0,0 +1,56 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.campaign import counters, exceptions, service
+from src.campaign.models import Campaign, CampaignRef
+from src.user.models import User, UserIdentity
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENT_REACTIONS = 2000
+
+
+async def react(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    campaign: CampaignRef,
+    user: User,
+) -> None:
+    async with db_sessionmaker.begin() as db:
+        await service.user_reaction_to_campaign(
+            db,
+            campaign,
+            UserIdentity(user.id, user.email, user.firstname, user.lastname),
+        )
+
+
+async def test_concurrent_reactions_are_all_counted(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+    create_users: Callable[[int], Awaitable[list[User]]],
+    campaign: Campaign,
+) -> None:
+    campaign_ref = CampaignRef(
+        campaign.id, campaign.creator_id, campaign.progress, campaign.deadline
+    )
+    users = await create_users(CONCURRENT_REACTIONS)
+
+    await asyncio.gather(
+        *(react(db_sessionmaker, campaign_ref, user) for user in users)
+    )
+    # repeated reactions change nothing
+    results = await asyncio.gather(
+        *(react(db_sessionmaker, campaign_ref, user) for user in users[:100]),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, exceptions.UserAlreadyReacted) for result in results)
+
+    async with db_sessionmaker() as db:
+        pending = await counters.get_pending(db, [campaign.id])
+        compacted = await db.get(Campaign, campaign.id)
+    assert compacted is not None
+    assert (
+        compacted.no_of_reactions + pending[campaign.id].no_of_reactions
+        == CONCURRENT_REACTIONS
+    )
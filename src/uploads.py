@@ -0,0 +1,43 @@
+from collections.abc import AsyncIterator
+
+from fastapi import UploadFile
+
+from src.config import settings
+from src.constants import UPLOAD_CHUNK_SIZE
+from src.exceptions import PayloadTooLarge
+from src.storage import StoredBlob, blob_store
+
+
+async def iter_upload(
+    upload: UploadFile, max_size: int = settings.MAX_UPLOAD_FILE_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Yield an uploaded file in fixed size chunks, failing once it passes
+    `max_size`. Starlette has already spooled the whole part by now, so this
+    bounds what is read back, not what is received; RequestBodyLimitMiddleware
+    is what stops an oversized upload early.
+    """
+    # the size starlette counted while spooling, when it is known
+    if upload.size is not None and upload.size > max_size:
+        raise PayloadTooLarge()
+    await upload.seek(0)
+    size = 0
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            raise PayloadTooLarge()
+        yield chunk
+
+
+async def store_upload(
+    upload: UploadFile,
+    default_content_type: str,
+    max_size: int = settings.MAX_UPLOAD_FILE_SIZE,
+) -> StoredBlob:
+    """Stream an uploaded file straight into the blob store"""
+    try:
+        return await blob_store.put_stream(
+            iter_upload(upload, max_size), upload.content_type or default_content_type
+        )
+    finally:
+        await upload.close()
@@ -1,3 +1,6 @@
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
 from typing import Annotated
 
@@ -7,15 +10,36 @@ from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from src.cache import TTLLRUCache
 from src.config import settings
 from src.database import session
+from src.ratelimit import RateLimiter
 from src.user import exceptions, schemas, service
 from src.user.exceptions import InvalidAccessToken
-from src.user.models import User
+from src.user.models import User, UserIdentity
 from src.user.schemas import AccessTokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login", scopes={})
 
+# validated claims by sha256 of the token, each kept until the token expires
+_verified_tokens: TTLLRUCache[bytes, AccessTokenData] = TTLLRUCache(
+    "access_token",
+    maxsize=settings.ACCESS_TOKEN_CACHE_SIZE,
+    ttl=timedelta(days=1).total_seconds(),
+)
+
+AccessTokenCheck = Callable[[AccessTokenData], bool]
+_access_token_checks: list[AccessTokenCheck] = []
+
+
+def add_access_token_check(check: AccessTokenCheck) -> None:
+    """
+    Register a revocation check (deny or allow list); a token is rejected
+    when any check returns False. Checks run on every request, cached tokens
+    included.
+    """
+    _access_token_checks.append(check)
+
 
 def generate_access_token(user: User) -> str:
     jwt_data = {
@@ -29,31 +53,54 @@ def generate_access_token(user: User) -> str:
     )
 
 
-def parse_access_token(
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-) -> AccessTokenData:
+def decode_access_token(access_token: str) -> AccessTokenData:
     try:
         payload = jwt.decode(
             access_token, key=settings.JWT_SECRET, algorithms=[settings.JWT_ALG]
         )
-        token_payload_valid = AccessTokenData(**payload)
+        return AccessTokenData(**payload)
     except (JWTError, ValidationError):
         raise InvalidAccessToken()
 
+
+def parse_access_token(
+    access_token: Annotated[str, Depends(oauth2_scheme)],
+) -> AccessTokenData:
+    token_digest = hashlib.sha256(access_token.encode()).digest()
+    token_payload_valid = _verified_tokens.get(token_digest)
+    if token_payload_valid is None:
+        token_payload_valid = decode_access_token(access_token)
+        _verified_tokens.set(
+            token_digest,
+            token_payload_valid,
+            ttl=token_payload_valid.exp.timestamp() - time.time(),
+        )
+
+    if not all(check(token_payload_valid) for check in _access_token_checks):
+        raise InvalidAccessToken()
     return token_payload_valid
 
 
 async def validate_user_access_token(
     db: Annotated[AsyncSession, Depends(session)],
     token_data: Annotated[AccessTokenData, Depends(parse_access_token)],
-) -> User:
-    user = await service.check_user_exists_by_id(db, user_id=token_data.sub)
+) -> UserIdentity:
+    user = await service.get_user_identity(db, user_id=token_data.sub)
     if not user:
         raise exceptions.InvalidAccessToken()
 
     return user
 
 
+def limit_by_user(limiter: RateLimiter) -> Callable[..., Awaitable[None]]:
+    async def rate_limit_by_user(
+        user: Annotated[UserIdentity, Depends(validate_user_access_token)],
+    ) -> None:
+        await limiter.hit(str(user.id))
+
+    return rate_limit_by_user
+
+
 async def validate_user_not_exist(
     db: Annotated[AsyncSession, Depends(session)],
     data: schemas.UserCreateRequest,
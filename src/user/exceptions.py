@@ -1,4 +1,4 @@
-from src.exceptions import BadRequest, NotAuthenticated, NotFound
+from src.exceptions import BadRequest, NotAuthenticated, NotFound, ServiceUnavailable
 
 
 class InvalidAccessToken(NotAuthenticated):
@@ -20,3 +20,10 @@ class UserEmailExists(BadRequest):
 
 class InvalidCredentials(NotAuthenticated):
     DETAIL = "Invalid credentials."
+
+
+class PasswordHashingUnavailable(ServiceUnavailable):
+    DETAIL = "Too Many Password Checks In Progress, Retry Shortly."
+
+    def __init__(self):
+        super().__init__(headers={"Retry-After": "1"})
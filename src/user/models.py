@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import NamedTuple
 from uuid import UUID
 
 from sqlalchemy import String, UniqueConstraint
@@ -24,3 +25,15 @@ class User(Base):
     firstname: Mapped[str] = mapped_column(String(255))
     lastname: Mapped[str] = mapped_column(String(255))
     password: Mapped[str] = mapped_column(String(255))
+
+
+class UserIdentity(NamedTuple):
+    """What request handlers need of the authenticated user"""
+
+    id: UUID
+    email: str
+    firstname: str
+    lastname: str
+
+
+USER_IDENTITY_COLUMNS = tuple(getattr(User, field) for field in UserIdentity._fields)
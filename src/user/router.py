@@ -6,16 +6,22 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 from starlette import status
 
 from src.database import session
+from src.ratelimit import RateLimiter, limit_by_ip
 from src.user import dependencies as deps
 from src.user import schemas, service
 
 user_router = APIRouter()
 
+# per client ip; every attempt costs a bcrypt round
+signup_limiter = RateLimiter("signup", limit=5, window=10 * 60)
+login_limiter = RateLimiter("login", limit=10, window=60)
+
 
 @user_router.post(
     "/signup",
     response_model=None,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip(signup_limiter))],
 )
 async def register_user(
     data: Annotated[schemas.UserCreateRequest, Depends(deps.validate_user_not_exist)],
@@ -31,6 +37,7 @@ async def register_user(
     "/login",
     response_model=schemas.LoginUserResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_by_ip(login_limiter))],
 )
 async def login(
     data: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -1,11 +1,72 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
 from passlib.context import CryptContext
 
-password_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.config import settings
+from src.user.exceptions import PasswordHashingUnavailable
+
+# hashes below the minimum cost are flagged for a rehash on login
+password_ctx = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__min_rounds=12
+)
+
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so worker threads hash in parallel
+_executor: ThreadPoolExecutor | None = None
+# hashes running or waiting for a worker; past this, requests wait for a slot
+_slots = asyncio.Semaphore(settings.PASSWORD_HASHING_MAX_PENDING)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            thread_name_prefix="password-hashing",
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def run_in_executor(func: Callable[..., T], *args) -> T:
+    """
+    Run a bcrypt call off the event loop, failing with a 503 when no slot
+    frees up within `PASSWORD_HASHING_QUEUE_TIMEOUT` seconds.
+    """
+    try:
+        async with asyncio.timeout(settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+            await _slots.acquire()
+    except TimeoutError:
+        raise PasswordHashingUnavailable()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(), func, *args
+        )
+    finally:
+        _slots.release()
 
 
-def hash_password(password: str) -> str:
-    return password_ctx.hash(password)
+async def hash_password(password: str) -> str:
+    return await run_in_executor(password_ctx.hash, password)
 
 
-def check_password(password: str, db_password_hash: str) -> bool:
-    return password_ctx.verify(password, hash=db_password_hash)
+async def verify_and_update_password(
+    password: str, db_password_hash: str
+) -> tuple[bool, str | None]:
+    """
+    Check the password; when it matches a hash made with outdated settings,
+    also return a fresh hash to store in its place.
+    """
+    return await run_in_executor(
+        password_ctx.verify_and_update, password, db_password_hash
+    )
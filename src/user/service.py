@@ -3,9 +3,11 @@ from uuid import UUID, uuid4
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from src.cache import two_tier_cache
+from src.config import settings
 from src.user import exceptions
-from src.user.models import Gender, User
-from src.user.security import check_password, hash_password
+from src.user.models import USER_IDENTITY_COLUMNS, Gender, User, UserIdentity
+from src.user.security import hash_password, verify_and_update_password
 
 
 async def check_user_exists_by_id(db: AsyncSession, user_id: UUID) -> User | None:
@@ -13,6 +15,23 @@ async def check_user_exists_by_id(db: AsyncSession, user_id: UUID) -> User | Non
     return query_scalars.one_or_none()
 
 
+# invalidate with `get_user_identity.invalidate(user_id)` once a user change
+# committed
+@two_tier_cache(
+    "user_identity",
+    UserIdentity,
+    ttl=settings.USER_IDENTITY_CACHE_TTL,
+    local_ttl=settings.USER_IDENTITY_LOCAL_CACHE_TTL,
+    maxsize=settings.USER_IDENTITY_CACHE_SIZE,
+)
+async def get_user_identity(db: AsyncSession, user_id: UUID) -> UserIdentity | None:
+    query_result = await db.execute(
+        select(*USER_IDENTITY_COLUMNS).where(User.id == user_id)
+    )
+    row = query_result.one_or_none()
+    return UserIdentity(*row) if row else None
+
+
 async def check_user_exists_by_email(db: AsyncSession, email: str) -> User | None:
     query_scalars = await db.scalars(select(User).where(User.email == email))
     return query_scalars.one_or_none()
@@ -32,7 +51,7 @@ async def create_user(
         firstname=first_name,
         lastname=last_name,
         gender=gender,
-        password=hash_password(password),
+        password=await hash_password(password),
     )
     db.add(user)
     return user
@@ -41,6 +60,13 @@ async def create_user(
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
     if not (user := await check_user_exists_by_email(db, email)):
         raise exceptions.UserNotFound()
-    if not check_password(password, db_password_hash=user.password):
+    valid, new_password_hash = await verify_and_update_password(
+        password, db_password_hash=user.password
+    )
+    if not valid:
         raise exceptions.InvalidCredentials()
+    if new_password_hash:
+        # rehash passwords hashed with outdated settings on login
+        user.password = new_password_hash
+        db.add(user)
     return user